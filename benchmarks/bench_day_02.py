@@ -0,0 +1,59 @@
+import random
+
+from benchmarks.timing import bench
+from solutions.day_02 import GameTable, parse, parse_table, solve_p1, solve_p2
+
+COLORS = ("red", "green", "blue")
+
+
+def generate_games(
+    n_games: int, max_draws: int = 6, colors: tuple[str, ...] = COLORS, seed: int = 0
+) -> str:
+    rng = random.Random(seed)
+    lines = []
+    for game_id in range(1, n_games + 1):
+        draws = []
+        for _ in range(rng.randint(1, max_draws)):
+            drawn = rng.sample(colors, rng.randint(1, len(colors)))
+            draws.append(", ".join(f"{rng.randint(1, 20)} {color}" for color in drawn))
+        lines.append(f"Game {game_id}: " + "; ".join(draws))
+    return "\n".join(lines)
+
+
+def bench_parse(n_games: int = 100_000) -> None:
+    games = generate_games(n_games)
+    strict = bench(
+        "parse (strict, pydantic)", lambda data: list(parse(data, True)), games
+    )
+    fast = bench("parse (fast, slotted)", lambda data: list(parse(data)), games)
+    table = bench("parse_table (tokenizer)", parse_table, games)
+    print(f"{'games/s strict':<40} {n_games / strict:>10.0f}")
+    print(f"{'games/s fast':<40} {n_games / fast:>10.0f}")
+    print(f"{'games/s tokenizer':<40} {n_games / table:>10.0f}")
+
+
+def solve_both(table: GameTable) -> int:
+    table = GameTable(table.ids, table.offsets, table.counts, table.registry)
+    return solve_p1(table) + solve_p2(table)
+
+
+def bench_solve(n_games: int = 100_000) -> None:
+    games = list(parse(generate_games(n_games)))
+    table = GameTable.from_games(games)
+    assert solve_p1(games) == solve_p1(table)
+    assert solve_p2(games) == solve_p2(table)
+    bench("solve_p1 + solve_p2 (objects)", lambda g: solve_p1(g) + solve_p2(g), games)
+    bench("solve_p1 + solve_p2 (table)", solve_both, table)
+
+
+def bench_colors(n_games: int = 100_000) -> None:
+    for n_colors in (3, 12, 48):
+        colors = COLORS + tuple(f"color_{i}" for i in range(n_colors - len(COLORS)))
+        table = parse_table(generate_games(n_games, colors=colors))
+        bench(f"solve_p1 + solve_p2 (table, {n_colors} colors)", solve_both, table)
+
+
+if __name__ == "__main__":
+    bench_parse()
+    bench_solve()
+    bench_colors()
@@ -0,0 +1,63 @@
+from concurrent.futures import ProcessPoolExecutor
+import os
+import random
+import tempfile
+
+from benchmarks.timing import bench
+from solutions.day_03 import Schematic, solve_file
+
+SYMBOLS = "#$+/@=%-&"
+
+
+def generate_schematic(size: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    lines = []
+    for _ in range(size):
+        line = ""
+        while len(line) < size:
+            roll = rng.random()
+            if roll < 0.5:
+                line += "." * rng.randint(1, 4)
+            elif roll < 0.8:
+                line += f"{rng.randint(1, 999)}."
+            elif roll < 0.9:
+                line += "*"
+            else:
+                line += rng.choice(SYMBOLS)
+        lines.append(line[:size])
+    return "\n".join(lines)
+
+
+def solve_both(data: str) -> int:
+    schematic = Schematic.from_string(data)
+    return schematic.solve_p1() + schematic.solve_p2()
+
+
+def bench_solve(sizes: tuple[int, ...] = (140, 1000, 2000)) -> None:
+    for size in sizes:
+        data = generate_schematic(size)
+        bench(f"solve_p1 + solve_p2 ({size}x{size})", solve_both, data)
+
+
+def bench_bands(size: int = 4000, band_rows: int = 256) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "schematic.txt")
+        with open(path, "w") as file:
+            file.write(generate_schematic(size))
+        bench(f"solve_file ({size}x{size}, in-process)", solve_file, path)
+        bench(
+            f"solve_file ({size}x{size}, {band_rows}-row bands)",
+            lambda path: solve_file(path, band_rows),
+            path,
+        )
+        with ProcessPoolExecutor() as executor:
+            bench(
+                f"solve_file ({size}x{size}, process pool)",
+                lambda path: solve_file(path, band_rows, executor),
+                path,
+            )
+
+
+if __name__ == "__main__":
+    bench_solve()
+    bench_bands()
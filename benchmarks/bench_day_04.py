@@ -0,0 +1,64 @@
+from io import StringIO
+import random
+
+from benchmarks.timing import bench
+from solutions.day_04 import (
+    match_counts,
+    n_matches,
+    n_matches_bits,
+    parse,
+    parse_bits,
+    propagate_copies,
+    score_counts,
+    solve_p1,
+    solve_p2,
+    solve_stream,
+)
+
+
+def generate_cards(
+    n_cards: int, n_winning: int = 10, n_yours: int = 25, seed: int = 0
+) -> str:
+    rng = random.Random(seed)
+    lines = []
+    for card in range(1, n_cards + 1):
+        winning = " ".join(f"{n:>2}" for n in rng.sample(range(1, 100), n_winning))
+        yours = " ".join(f"{n:>2}" for n in rng.sample(range(1, 100), n_yours))
+        lines.append(f"Card {card:>6}: {winning} | {yours}")
+    return "\n".join(lines)
+
+
+def bench_matches(n_cards: int = 200_000) -> None:
+    cards = generate_cards(n_cards)
+    bench(
+        "match counts (sets)",
+        lambda data: [n_matches(*card) for card in parse(data)],
+        cards,
+    )
+    bench(
+        "match counts (bitmasks)",
+        lambda data: [n_matches_bits(*card) for card in parse_bits(data)],
+        cards,
+    )
+    bench("match counts (boolean matrices)", match_counts, cards)
+
+
+def solve_shared(data: str) -> tuple[int, int]:
+    counts = match_counts(data)
+    return score_counts(counts), propagate_copies(counts.tolist())
+
+
+def bench_solve(n_cards: int = 200_000) -> None:
+    cards = generate_cards(n_cards)
+    bench(
+        "solve_p1 + solve_p2 (parsed twice)",
+        lambda data: (solve_p1(data), solve_p2(data)),
+        cards,
+    )
+    bench("solve_p1 + solve_p2 (parsed once)", solve_shared, cards)
+    bench("solve_stream", lambda data: solve_stream(StringIO(data)), cards)
+
+
+if __name__ == "__main__":
+    bench_matches()
+    bench_solve()
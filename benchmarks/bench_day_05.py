@@ -0,0 +1,70 @@
+from io import StringIO
+import random
+
+import numpy as np
+
+from benchmarks.timing import bench, traced_size
+from solutions.day_05 import (
+    Category,
+    find_changeovers,
+    follow_one,
+    parse_lines,
+    parse_tables,
+    solve_p2,
+    solve_p2_changeovers,
+)
+
+
+def generate_almanac(
+    n_seed_ranges: int, n_ranges: int, span: int = 2**32, seed: int = 0
+) -> str:
+    rng = random.Random(seed)
+    seeds = []
+    for _ in range(n_seed_ranges):
+        seeds += [rng.randrange(span), rng.randrange(1, span // n_seed_ranges)]
+    lines = ["seeds: " + " ".join(map(str, seeds)), ""]
+
+    categories = [category.name.lower() for category in Category]
+    for source, dest in zip(categories, categories[1:]):
+        cuts = sorted(rng.sample(range(1, span), n_ranges - 1))
+        pieces = list(zip([0, *cuts], [*cuts, span]))
+        rng.shuffle(pieces)
+        lines.append(f"{source}-to-{dest} map:")
+        dest_start = 0
+        for start, stop in pieces:
+            lines.append(f"{dest_start} {start} {stop - start}")
+            dest_start += stop - start
+        lines.append("")
+    return "\n".join(lines)
+
+
+def bench_solve_p2() -> None:
+    almanac = generate_almanac(n_seed_ranges=10_000, n_ranges=100)
+    assert solve_p2(almanac) == solve_p2_changeovers(almanac)
+    bench("solve_p2 (interval splitting)", solve_p2, almanac)
+    bench("solve_p2_changeovers", solve_p2_changeovers, almanac)
+
+
+def bench_mappings(n_lines: int = 1_000_000) -> None:
+    almanac = generate_almanac(n_seed_ranges=1, n_ranges=n_lines // 7)
+    lines = almanac.splitlines()
+    mappings, ranges_size = traced_size(parse_lines, lines[1:])
+    (_, tables), tables_size = traced_size(parse_tables, StringIO(almanac))
+    print(f"{'Mappings (range tuples)':<40} {ranges_size / 2**20:>10.1f} MiB")
+    print(f"{'MappingTables (int64 columns)':<40} {tables_size / 2**20:>10.1f} MiB")
+
+    mapping, table = next(iter(mappings.values())), next(iter(tables.values()))
+    sources = np.random.default_rng(0).integers(0, 2**32, 100)
+    bench(
+        "follow_one x100 (range tuples)",
+        lambda _: [follow_one(source, mapping) for source in sources.tolist()],
+        None,
+    )
+    bench("follow x100 (table)", table.follow, sources)
+    bench("find_changeovers (range tuples)", find_changeovers, mapping)
+    bench("find_changeovers (table)", find_changeovers, table)
+
+
+if __name__ == "__main__":
+    bench_solve_p2()
+    bench_mappings()
@@ -0,0 +1,31 @@
+import numpy as np
+
+from benchmarks.timing import bench
+from solutions.day_06 import ways_to_win, ways_to_win_batch
+
+
+def generate_races(n_races: int, seed: int = 0) -> tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    times = rng.integers(1, 10**6, size=n_races)
+    holds = rng.integers(0, times // 2 + 1)
+    return times, holds * (times - holds)
+
+
+def scalar(races: tuple[np.ndarray, np.ndarray]) -> list[int]:
+    times, records = races
+    return [ways_to_win(t, r) for t, r in zip(times.tolist(), records.tolist())]
+
+
+def bench_batch(n_races: int = 1_000_000) -> None:
+    races = generate_races(n_races)
+    assert scalar(races) == ways_to_win_batch(*races).tolist()
+    bench(f"ways_to_win ({n_races} races, scalar)", scalar, races)
+    bench(
+        f"ways_to_win_batch ({n_races} races)",
+        lambda races: ways_to_win_batch(*races),
+        races,
+    )
+
+
+if __name__ == "__main__":
+    bench_batch()
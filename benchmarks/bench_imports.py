@@ -0,0 +1,59 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODULES = tuple(f"solutions.day_{day:02}" for day in range(1, 7))
+LAZY_MODULES = ("aocd", "concurrent", "dotenv", "pydantic", "scipy")
+BUDGET_MS = 250
+
+
+def import_profile(module: str) -> tuple[int, dict[str, int], set[str]]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    children, packages = {}, set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        name = name.strip()
+        if depth == 0 and name == module:
+            return int(cumulative), children, packages
+        if depth == 0:
+            children, packages = {}, set()
+            continue
+        packages.add(name.partition(".")[0])
+        if depth == 1:
+            children[name] = int(cumulative)
+    raise RuntimeError(f"{module} not found in -X importtime output")
+
+
+def check_imports(
+    modules: tuple[str, ...] = MODULES, budget_ms: float = BUDGET_MS, n_slowest: int = 3
+) -> list[str]:
+    failures = []
+    for module in modules:
+        total, children, packages = min(
+            (import_profile(module) for _ in range(3)), key=lambda profile: profile[0]
+        )
+        print(f"{'import ' + module:<40} {total / 1000:>10.2f} ms")
+        for name in sorted(children, key=children.get, reverse=True)[:n_slowest]:
+            print(f"{'  ' + name:<40} {children[name] / 1000:>10.2f} ms")
+        if total / 1000 > budget_ms:
+            failures.append(f"{module} took {total / 1000:.0f} ms (> {budget_ms} ms)")
+        for package in sorted(packages.intersection(LAZY_MODULES)):
+            failures.append(f"{module} imports {package} at import time")
+    return failures
+
+
+if __name__ == "__main__":
+    failures = check_imports()
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,16 @@
+import timeit
+import tracemalloc
+
+
+def bench(name: str, func, data, number: int = 1) -> float:
+    seconds = min(timeit.repeat(lambda: func(data), number=number, repeat=3)) / number
+    print(f"{name:<40} {seconds * 1000:>10.2f} ms")
+    return seconds
+
+
+def traced_size(func, *args) -> tuple[object, int]:
+    tracemalloc.start()
+    result = func(*args)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size
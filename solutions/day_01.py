@@ -1,37 +1,123 @@
-from typing import Callable, Generator
-
-from dotenv import load_dotenv
-
-load_dotenv()
-
-from aocd import data, submit
+from collections import deque
+import mmap
+import os
+from typing import Callable, Generator, Iterable
+
+import numpy as np
+
+from solutions.puzzle import Puzzle
+
+DIGITS = {str(digit): digit for digit in range(10)}
+NUMBER_WORDS = {
+    "one": 1,
+    "two": 2,
+    "three": 3,
+    "four": 4,
+    "five": 5,
+    "six": 6,
+    "seven": 7,
+    "eight": 8,
+    "nine": 9,
+}
+
+Automaton = tuple[list[dict[str, int]], list[tuple[int, ...]]]
+Automatons = tuple[Automaton, Automaton]
+
+
+def build_automaton(words: dict[str, int]) -> Automaton:
+    goto = [{}]
+    values = [()]
+    for word, value in words.items():
+        state = 0
+        for char in word:
+            if char not in goto[state]:
+                goto[state][char] = len(goto)
+                goto.append({})
+                values.append(())
+            state = goto[state][char]
+        values[state] = (value,)
+
+    alphabet = {char for word in words for char in word}
+    transitions = [{} for _ in goto]
+    outputs = list(values)
+    fail = [0] * len(goto)
+    queue = deque()
+    for char in alphabet:
+        next_state = goto[0].get(char, 0)
+        transitions[0][char] = next_state
+        if next_state:
+            queue.append(next_state)
+
+    while queue:
+        state = queue.popleft()
+        outputs[state] = values[state] + outputs[fail[state]]
+        for char in alphabet:
+            if char in goto[state]:
+                next_state = goto[state][char]
+                fail[next_state] = transitions[fail[state]][char]
+                transitions[state][char] = next_state
+                queue.append(next_state)
+            else:
+                transitions[state][char] = transitions[fail[state]][char]
+
+    return transitions, outputs
+
+
+def build_automatons(words: dict[str, int]) -> Automatons:
+    reversed_words = {word[::-1]: value for word, value in words.items()}
+    return build_automaton(words), build_automaton(reversed_words)
+
+
+def scan_digits(line: str, automaton: Automaton) -> Generator[int, None, None]:
+    transitions, outputs = automaton
+    state = 0
+    for char in line:
+        state = transitions[state].get(char, 0)
+        yield from outputs[state]
+
+
+def first_match(chars: Iterable[str], automaton: Automaton) -> int:
+    transitions, outputs = automaton
+    state = 0
+    for char in chars:
+        state = transitions[state].get(char, 0)
+        if outputs[state]:
+            return outputs[state][0]
+    raise ValueError("no digits found")
+
+
+def calibration_value(line: str, automatons: Automatons) -> int:
+    forward, backward = automatons
+    return 10 * first_match(line, forward) + first_match(reversed(line), backward)
+
+
+def make_digit_extractor(words: dict[str, int]) -> Callable:
+    automaton = build_automaton(words)
+
+    def extract_digits(line: str) -> Generator[int, None, None]:
+        yield from scan_digits(line, automaton)
+
+    return extract_digits
 
 
 def extract_digits_p1(line: str) -> Generator[int, None, None]:
     yield from (int(char) for char in line if char.isdigit())
 
 
+DIGITS_AUTOMATONS = build_automatons(DIGITS)
+DIGIT_WORDS_AUTOMATONS = build_automatons(DIGITS | NUMBER_WORDS)
+
+
 def extract_digits_p2(line: str) -> Generator[int, None, None]:
-    number_words = {
-        "one": 1,
-        "two": 2,
-        "three": 3,
-        "four": 4,
-        "five": 5,
-        "six": 6,
-        "seven": 7,
-        "eight": 8,
-        "nine": 9,
-    }
-
-    for i in range(len(line)):
-        if line[i].isdigit():
-            yield int(line[i])
-        else:
-            for word, num in number_words.items():
-                if line[i:].startswith(word):
-                    yield num
-                    break
+    yield from scan_digits(line, DIGIT_WORDS_AUTOMATONS[0])
+
+
+def calibration_value_p1(line: str) -> int:
+    return calibration_value(line, DIGITS_AUTOMATONS)
+
+
+def calibration_value_p2(line: str) -> int:
+    return calibration_value(line, DIGIT_WORDS_AUTOMATONS)
 
 
 def extract_number(digits: list[int]) -> int:
@@ -43,15 +129,67 @@ def parse(data: str, digit_extractor: Callable) -> Generator[int, None, None]:
     yield from (extract_number(digit_extractor(line)) for line in data.splitlines())
 
 
+def parse_calibration(
+    data: str, read_calibration: Callable[[str], int]
+) -> Generator[int, None, None]:
+    yield from (read_calibration(line) for line in data.splitlines())
+
+
 def solve(numbers) -> int:
     return sum(numbers)
 
 
+def calibration_sum(chunk: np.ndarray) -> int:
+    digits = np.flatnonzero((chunk >= ord("0")) & (chunk <= ord("9")))
+    newlines = np.flatnonzero(chunk == ord("\n"))
+    line_starts = np.concatenate(([0], newlines + 1))
+    line_ends = np.concatenate((newlines, [len(chunk)]))
+    if line_starts[-1] == len(chunk):
+        line_starts, line_ends = line_starts[:-1], line_ends[:-1]
+
+    first = np.searchsorted(digits, line_starts)
+    last = np.searchsorted(digits, line_ends) - 1
+    if np.any(first > last):
+        raise ValueError("no digits found")
+    tens = chunk[digits[first]].astype(np.int64) - ord("0")
+    ones = chunk[digits[last]].astype(np.int64) - ord("0")
+    return int(10 * tens.sum() + ones.sum())
+
+
+def solve_buffer_p1(buffer: bytes | mmap.mmap, chunk_size: int = 1 << 26) -> int:
+    array = np.frombuffer(buffer, dtype=np.uint8)
+    total = 0
+    start = 0
+    while start < len(array):
+        stop = start + chunk_size
+        if stop < len(array):
+            newline = buffer.rfind(b"\n", start, stop)
+            if newline < start:
+                newline = buffer.find(b"\n", stop)
+            stop = len(array) if newline == -1 else newline + 1
+        total += calibration_sum(array[start:stop])
+        start = stop
+    return total
+
+
+def solve_file_p1(path: str | os.PathLike, chunk_size: int = 1 << 26) -> int:
+    if not os.path.getsize(path):
+        return 0
+    with open(path, "rb") as file:
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            return solve_buffer_p1(buffer, chunk_size)
+
+
+PUZZLE = Puzzle(day=1)
+
+
 if __name__ == "__main__":
-    numbers_p1 = parse(data, extract_digits_p1)
+    data = PUZZLE.data
+
+    numbers_p1 = parse_calibration(data, calibration_value_p1)
     answer_p1 = solve(numbers_p1)
-    submit(answer_p1)
+    PUZZLE.submit(answer_p1, part="a")
 
-    numbers_p2 = parse(data, extract_digits_p2)
+    numbers_p2 = parse_calibration(data, calibration_value_p2)
     answer_p2 = solve(numbers_p2)
-    submit(answer_p2)
+    PUZZLE.submit(answer_p2, part="b")
@@ -1,82 +1,386 @@
 from __future__ import annotations
+from array import array
 from math import prod
-from typing import Callable, Generator, Iterable
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Callable, Generator, Iterable, Iterator, Mapping
 import re
 
-from dotenv import load_dotenv
+import numpy as np
 
-load_dotenv()
+from solutions.puzzle import Puzzle
 
-from aocd import submit, get_data
-from pydantic import BaseModel, Field
+if TYPE_CHECKING:
+    from solutions.day_02_models import Cubes, Game
 
-data = get_data(day=2)
+GameTokens = tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]
+MAX_CUBES = MappingProxyType({"red": 12, "green": 13, "blue": 14})
 
 
-class Cubes(BaseModel):
-    red: int = 0
-    green: int = 0
-    blue: int = 0
+def __getattr__(name: str) -> type:
+    if name in ("Cubes", "Game"):
+        from solutions import day_02_models
 
-    def possible(self, max_cubes: Cubes) -> bool:
-        return all(
-            [
-                self.red <= max_cubes.red,
-                self.green <= max_cubes.green,
-                self.blue <= max_cubes.blue,
-            ]
-        )
+        return getattr(day_02_models, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+class ColorRegistry:
+    __slots__ = ("indices", "frozen")
+
+    def __init__(
+        self, colors: Iterable[str] = ("red", "green", "blue"), frozen: bool = False
+    ) -> None:
+        self.indices = {}
+        self.frozen = False
+        for color in colors:
+            self.index(color)
+        self.frozen = frozen
+
+    def __len__(self) -> int:
+        return len(self.indices)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.indices)
+
+    def index(self, color: str) -> int:
+        index = self.indices.get(color)
+        if index is None:
+            if self.frozen:
+                raise ValueError(
+                    f"unknown color {color!r}, pass a ColorRegistry that can grow"
+                )
+            index = self.indices[color] = len(self.indices)
+        return index
+
+    def vector(self, cubes: Cubes | FastCubes | Mapping[str, int]) -> list[int]:
+        # Colors that cubes does not mention count as 0, so when cubes holds
+        # the limits, a color missing from them allows no cubes of that color.
+        if isinstance(cubes, FastCubes) and cubes.registry is self:
+            return cubes.counts + [0] * (len(self) - len(cubes.counts))
+        if isinstance(cubes, (FastCubes, Mapping)):
+            return [cubes.get(color, 0) for color in self]
+        return [getattr(cubes, color, 0) for color in self]
+
+
+COLORS = ColorRegistry(frozen=True)
+
+
+class FastCubes:
+    __slots__ = ("counts", "registry")
+
+    def __init__(
+        self,
+        counts: Iterable[int] = (),
+        registry: ColorRegistry = COLORS,
+        **named_counts: int,
+    ) -> None:
+        self.counts = list(counts)
+        self.registry = registry
+        for color, count in named_counts.items():
+            self[color] = count
+
+    def __getitem__(self, color: str) -> int:
+        index = self.registry.indices.get(color, len(self.counts))
+        return self.counts[index] if index < len(self.counts) else 0
 
+    def __setitem__(self, color: str, count: int) -> None:
+        index = self.registry.index(color)
+        if index >= len(self.counts):
+            self.counts.extend([0] * (index + 1 - len(self.counts)))
+        self.counts[index] = count
 
-class Game(BaseModel):
-    id: int
-    draws: list[Cubes] = Field(default_factory=list)
+    def get(self, color: str, default: int = 0) -> int:
+        return self[color] if color in self.registry.indices else default
 
-    def possible(self, max_cubes: Cubes) -> bool:
-        return all([draw.possible(max_cubes) for draw in self.draws])
+    def nonzero(self) -> dict[str, int]:
+        return {
+            color: count for color, count in zip(self.registry, self.counts) if count
+        }
 
-    def minimal_set(self) -> Cubes:
-        return Cubes(
-            red=max(draw.red for draw in self.draws),
-            green=max(draw.green for draw in self.draws),
-            blue=max(draw.blue for draw in self.draws),
+    @property
+    def red(self) -> int:
+        return self["red"]
+
+    @property
+    def green(self) -> int:
+        return self["green"]
+
+    @property
+    def blue(self) -> int:
+        return self["blue"]
+
+    def __eq__(self, other: object) -> bool:
+        if hasattr(other, "model_dump"):
+            other = FastCubes(**other.model_dump())
+        if not isinstance(other, FastCubes):
+            return NotImplemented
+        return self.nonzero() == other.nonzero()
+
+    def __repr__(self) -> str:
+        counts = ", ".join(
+            f"{color}={count}" for color, count in self.nonzero().items()
         )
+        return f"FastCubes({counts})"
+
+    def within(self, limits: list[int]) -> bool:
+        return all(count <= limit for count, limit in zip(self.counts, limits))
+
+    def possible(self, max_cubes: Cubes | FastCubes | Mapping[str, int]) -> bool:
+        return self.within(self.registry.vector(max_cubes))
+
+
+class FastGame:
+    __slots__ = ("id", "draws")
+
+    def __init__(self, id: int, draws: Iterable[FastCubes] = ()) -> None:
+        self.id = id
+        self.draws = list(draws)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, FastGame) and not hasattr(other, "model_dump"):
+            return NotImplemented
+        return self.id == other.id and self.draws == other.draws
+
+    def __repr__(self) -> str:
+        return f"FastGame(id={self.id}, draws={self.draws})"
+
+    def possible(self, max_cubes: Cubes | FastCubes | Mapping[str, int]) -> bool:
+        if not self.draws:
+            return True
+        limits = self.draws[0].registry.vector(max_cubes)
+        return all(draw.within(limits) for draw in self.draws)
+
+    def minimal_set(self) -> FastCubes:
+        if not self.draws:
+            return FastCubes()
+        registry = self.draws[0].registry
+        columns = zip(*(registry.vector(draw) for draw in self.draws))
+        return FastCubes(map(max, columns), registry)
 
 
-def parse_draw(draw_str: str) -> Cubes:
-    items = re.findall(r"(\d+) (\w+)", draw_str)
-    return Cubes(**{color: int(count) for count, color in items})
+class GameTable:
+    __slots__ = ("ids", "offsets", "columns", "registry", "_minimal_sets")
 
+    def __init__(
+        self,
+        ids: np.ndarray,
+        offsets: np.ndarray,
+        counts: np.ndarray,
+        registry: ColorRegistry = COLORS,
+    ) -> None:
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        counts = np.asarray(counts, dtype=np.int64)
+        if counts.ndim == 1:
+            counts = counts.reshape(-1, len(registry))
+        self.columns = np.ascontiguousarray(counts.T)
+        self.registry = registry
+        self._minimal_sets = None
 
-def parse_draws(draws_str: str) -> Generator[Cubes, None, None]:
-    yield from (parse_draw(draw_str) for draw_str in draws_str.split("; "))
+    @property
+    def counts(self) -> np.ndarray:
+        return self.columns.T
 
+    @classmethod
+    def from_games(
+        cls, games: Iterable[Game | FastGame], registry: ColorRegistry | None = None
+    ) -> GameTable:
+        ids, offsets, draws = [], [], []
+        for game in games:
+            ids.append(game.id)
+            offsets.append(len(draws))
+            draws.extend(game.draws)
 
-def parse_game(game_str: str) -> Game:
+        if registry is None:
+            first = draws[0] if draws else None
+            registry = first.registry if isinstance(first, FastCubes) else COLORS
+            if any(
+                isinstance(draw, FastCubes) and draw.registry is not registry
+                for draw in draws
+            ):
+                registry = ColorRegistry(registry)
+        for draw in draws:
+            if isinstance(draw, FastCubes) and draw.registry is not registry:
+                for color in draw.nonzero():
+                    registry.index(color)
+        return cls(ids, offsets, [registry.vector(draw) for draw in draws], registry)
+
+    @classmethod
+    def from_tokens(cls, tokens: GameTokens, registry: ColorRegistry) -> GameTable:
+        game_ids, offsets, draws, counts, colors = tokens
+        columns = np.zeros((len(registry), offsets[-1]), dtype=np.int64)
+        columns[colors, draws] = counts
+        return cls(game_ids, offsets[:-1], columns.T, registry)
+
+    def column(self, color: str) -> np.ndarray:
+        index = self.registry.indices.get(color, len(self.columns))
+        if index >= len(self.columns):
+            return np.zeros(self.columns.shape[1], dtype=np.int64)
+        return self.columns[index]
+
+    @property
+    def red(self) -> np.ndarray:
+        return self.column("red")
+
+    @property
+    def green(self) -> np.ndarray:
+        return self.column("green")
+
+    @property
+    def blue(self) -> np.ndarray:
+        return self.column("blue")
+
+    def minimal_sets(self) -> np.ndarray:
+        if self._minimal_sets is None:
+            # Games without draws repeat the next game's offset, which reduceat
+            # would read as that game's first draw, so they keep an empty set.
+            n_draws = self.columns.shape[1]
+            has_draws = np.diff(self.offsets, append=n_draws) > 0
+            columns = np.zeros((len(self.columns), len(self.offsets)), dtype=np.int64)
+            if has_draws.any():
+                columns[:, has_draws] = np.maximum.reduceat(
+                    self.columns, self.offsets[has_draws], axis=1
+                )
+            self._minimal_sets = columns.T
+        return self._minimal_sets
+
+    def possible(self, max_cubes: Cubes | FastCubes | Mapping[str, int]) -> np.ndarray:
+        limits = self.registry.vector(max_cubes)[: len(self.columns)]
+        return np.all(self.minimal_sets() <= limits, axis=1)
+
+    def powers(self) -> np.ndarray:
+        minimal_sets = self.minimal_sets()
+        indices = [self.registry.indices.get(color) for color in COLORS]
+        if None in indices or max(indices) >= minimal_sets.shape[1]:
+            return np.zeros(len(minimal_sets), dtype=np.int64)
+        counted = minimal_sets > 0
+        counted[:, indices] = True
+        factors = np.where(counted, minimal_sets, 1)
+        bits = np.log2(factors.max(initial=0) + 1) * factors.shape[1]
+        if bits < 63:
+            return np.prod(factors, axis=1)
+        powers = np.zeros(len(factors), dtype=object)
+        complete = factors.all(axis=1)
+        powers[complete] = np.prod(factors[complete].astype(object), axis=1)
+        return powers
+
+
+DRAW_PATTERN = re.compile(r"(\d+) (\w+)")
+
+
+def parse_draw(
+    draw_str: str, strict: bool = False, registry: ColorRegistry | None = None
+) -> Cubes | FastCubes:
+    items = DRAW_PATTERN.findall(draw_str)
+    if strict:
+        from solutions.day_02_models import Cubes
+
+        return Cubes(**{color: int(count) for count, color in items})
+    cubes = FastCubes(registry=ColorRegistry() if registry is None else registry)
+    for count, color in items:
+        cubes[color] = int(count)
+    return cubes
+
+
+def parse_draws(
+    draws_str: str, strict: bool = False, registry: ColorRegistry | None = None
+) -> Generator[Cubes | FastCubes, None, None]:
+    registry = ColorRegistry() if registry is None else registry
+    yield from (
+        parse_draw(draw_str, strict, registry) for draw_str in draws_str.split("; ")
+    )
+
+
+def parse_game(
+    game_str: str, strict: bool = False, registry: ColorRegistry | None = None
+) -> Game | FastGame:
     game_id_str, draws_str = game_str.split(": ")
-    return Game(id=game_id_str.split()[-1], draws=parse_draws(draws_str))
+    game_id = game_id_str.split()[-1]
+    if strict:
+        from solutions.day_02_models import Game
+
+        return Game(id=game_id, draws=parse_draws(draws_str, strict))
+    registry = ColorRegistry() if registry is None else registry
+    return FastGame(
+        id=int(game_id),
+        draws=[parse_draw(draw, registry=registry) for draw in draws_str.split("; ")],
+    )
+
+
+def parse(
+    data: str, strict: bool = False, registry: ColorRegistry | None = None
+) -> Generator[Game | FastGame, None, None]:
+    registry = ColorRegistry() if registry is None else registry
+    yield from (parse_game(line, strict, registry) for line in data.splitlines())
+
 
+TOKEN_PATTERN = re.compile(r"Game (\d+)|(\d+) (\w+)|;")
 
-def parse(data: str) -> Generator[Game, None, None]:
-    yield from (parse_game(line) for line in data.splitlines())
+
+def tokenize(data: str, registry: ColorRegistry) -> GameTokens:
+    game_ids, offsets, draws, counts, colors = (array("q") for _ in range(5))
+    add_game_id, add_offset = game_ids.append, offsets.append
+    add_draw, add_count, add_color = draws.append, counts.append, colors.append
+    color_index = registry.index
+    draw = -1
+    for match in TOKEN_PATTERN.finditer(data):
+        game, count, color = match.groups()
+        if count:
+            add_draw(draw)
+            add_count(int(count))
+            add_color(color_index(color))
+        else:
+            draw += 1
+            if game:
+                add_game_id(int(game))
+                add_offset(draw)
+    # Like an indptr, offsets ends with the total number of draws.
+    add_offset(draw + 1)
+    return tuple(
+        np.frombuffer(column, dtype=np.int64)
+        for column in (game_ids, offsets, draws, counts, colors)
+    )
+
+
+def parse_table(data: str, registry: ColorRegistry | None = None) -> GameTable:
+    registry = ColorRegistry() if registry is None else registry
+    return GameTable.from_tokens(tokenize(data, registry), registry)
 
 
 def solve_p1(
-    games: Iterable[Game], max_cubes: Cubes = Cubes(red=12, green=13, blue=14)
+    games: Iterable[Game | FastGame] | GameTable,
+    max_cubes: Cubes | FastCubes | Mapping[str, int] = MAX_CUBES,
 ) -> int:
+    if isinstance(games, GameTable):
+        return int(games.ids[games.possible(max_cubes)].sum())
     return sum(game.id for game in games if game.possible(max_cubes))
 
 
-def power(cubes: Cubes) -> int:
-    return prod(cubes.dict().values())
+def power(cubes: Cubes | FastCubes) -> int:
+    # Red, green and blue always count, so a game that never shows one of them
+    # has power 0. Other colors count only in games that show them, so one
+    # game's power never depends on the colors other games registered.
+    counts = [cubes.red, cubes.green, cubes.blue]
+    if isinstance(cubes, FastCubes):
+        counts.extend(
+            count
+            for color, count in cubes.nonzero().items()
+            if color not in COLORS.indices
+        )
+    return prod(counts)
 
 
-def solve_p2(games: Iterable[Game]) -> int:
+def solve_p2(games: Iterable[Game | FastGame] | GameTable) -> int:
+    if isinstance(games, GameTable):
+        return int(games.powers().sum())
     return sum(power(game.minimal_set()) for game in games)
 
 
+PUZZLE = Puzzle(day=2)
+
+
 if __name__ == "__main__":
-    games = list(parse(data))
+    games = parse_table(PUZZLE.data)
 
-    submit(solve_p1(games), part="a")
-    submit(solve_p2(games), part="b")
+    PUZZLE.submit(solve_p1(games), part="a")
+    PUZZLE.submit(solve_p2(games), part="b")
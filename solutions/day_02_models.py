@@ -0,0 +1,42 @@
+from __future__ import annotations
+from typing import Mapping
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class Cubes(BaseModel):
+    # Reject colors other than red, green and blue instead of dropping them,
+    # which would silently disagree with the fast path.
+    model_config = ConfigDict(extra="forbid")
+
+    red: int = 0
+    green: int = 0
+    blue: int = 0
+
+    def possible(self, max_cubes: Cubes | Mapping[str, int]) -> bool:
+        if isinstance(max_cubes, Mapping):
+            max_cubes = Cubes(**max_cubes)
+        return all(
+            [
+                self.red <= max_cubes.red,
+                self.green <= max_cubes.green,
+                self.blue <= max_cubes.blue,
+            ]
+        )
+
+
+class Game(BaseModel):
+    id: int
+    draws: list[Cubes] = Field(default_factory=list)
+
+    def possible(self, max_cubes: Cubes | Mapping[str, int]) -> bool:
+        if isinstance(max_cubes, Mapping):
+            max_cubes = Cubes(**max_cubes)
+        return all(draw.possible(max_cubes) for draw in self.draws)
+
+    def minimal_set(self) -> Cubes:
+        return Cubes(
+            red=max((draw.red for draw in self.draws), default=0),
+            green=max((draw.green for draw in self.draws), default=0),
+            blue=max((draw.blue for draw in self.draws), default=0),
+        )
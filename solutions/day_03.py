@@ -1,88 +1,209 @@
-from dotenv import load_dotenv
+from __future__ import annotations
+from itertools import repeat
+from typing import TYPE_CHECKING, Iterable
+import mmap
+import os
 
-load_dotenv()
-
-from aocd import data, submit
-from scipy.ndimage import convolve
 import numpy as np
 
+from solutions.puzzle import Puzzle
 
-def sym_mask(grid):
-    return (grid != ".") & ~np.char.isdigit(grid)
-
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
 
-def gear_mask(grid):
-    return grid == "*"
+ROW_STRUCTURE = np.array([[0, 0, 0], [1, 1, 1], [0, 0, 0]])
+NEIGHBOURHOOD = np.array([(dr, dc) for dr in (-1, 0, 1) for dc in (-1, 0, 1)])
+ZERO, NINE, DOT, GEAR, NEWLINE = b"09.*\n"
 
 
-def adjacent_number_coords(mask):
-    kernel = np.array([[1, 1, 1], [1, 0, 1], [1, 1, 1]])
-    convolved_mask = convolve(mask.astype(int), kernel, mode="constant", cval=0)
-    adjacent_number_mask = (convolved_mask > 0) & num_mask
-    return np.argwhere(adjacent_number_mask)
+def row_layout(buffer: bytes | mmap.mmap, size: int) -> tuple[int, int, int]:
+    end = buffer.find(b"\n")
+    if end == -1:
+        return 1, size, size + 1
+    width = end - 1 if buffer[end - 1 : end] == b"\r" else end
+    stride = end + 1
+    return (size + stride - width) // stride, width, stride
 
 
-def drop_contiguous_points(coords):
-    contiguous = np.all(
-        np.logical_or(
-            coords[1:] == coords[:-1],
-            coords[1:] == coords[:-1] + 1,
-        ),
-        axis=1,
+def byte_grid(buffer: bytes | mmap.mmap) -> np.ndarray:
+    raw = np.frombuffer(buffer, dtype=np.uint8)
+    n_rows, width, stride = row_layout(buffer, len(raw))
+    return np.lib.stride_tricks.as_strided(
+        raw, shape=(n_rows, width), strides=(stride, 1), writeable=False
     )
-    mask = np.append([True], np.logical_not(contiguous))
-    return coords[mask]
 
 
-def extract_contiguous_number(row, col):
-    number = ""
-    i = col
-    while i >= 0 and num_mask[row, i]:
-        number = grid[row, i] + number
-        i -= 1
+def digit_mask(grid: np.ndarray) -> np.ndarray:
+    return (grid >= ZERO) & (grid <= NINE)
+
+
+def sym_mask(grid: np.ndarray) -> np.ndarray:
+    return (grid != DOT) & ((grid < ZERO) | (grid > NINE))
+
+
+def gear_mask(grid: np.ndarray) -> np.ndarray:
+    return grid == GEAR
+
+
+def label_numbers(
+    grid: np.ndarray, num_mask: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    from scipy.ndimage import label
+
+    labels, n_numbers = label(num_mask, structure=ROW_STRUCTURE)
+    cells = np.flatnonzero(labels)
+    cell_labels = labels.flat[cells]
+    sizes = np.bincount(cell_labels, minlength=n_numbers + 1)
+    ends = np.cumsum(sizes)[cell_labels]
+    digits = grid.flat[cells].astype(np.int64) - ZERO
+    place_values = np.int64(10) ** (ends - np.arange(1, len(cells) + 1))
+    values = np.zeros(n_numbers + 1, dtype=np.int64)
+    np.add.at(values, cell_labels, digits * place_values)
+    return labels, values
+
+
+def neighbourhood_labels(labels: np.ndarray, coords: np.ndarray) -> np.ndarray:
+    rows = coords[:, :1] + NEIGHBOURHOOD[:, 0]
+    cols = coords[:, 1:] + NEIGHBOURHOOD[:, 1]
+    return np.sort(labels[rows, cols], axis=1)
+
 
-    i = col + 1
-    while i < len(grid[row]) and num_mask[row, i]:
-        number += grid[row, i]
-        i += 1
+def gear_ratios(
+    labels: np.ndarray, values: np.ndarray, coords: np.ndarray
+) -> np.ndarray:
+    neighbours = neighbourhood_labels(labels, coords)
+    distinct = neighbours != 0
+    distinct[:, 1:] &= neighbours[:, 1:] != neighbours[:, :-1]
+    is_gear = distinct.sum(axis=1) == 2
+    factors = np.where(distinct[is_gear], values[neighbours[is_gear]], 1)
+    return np.prod(factors, axis=1)
 
-    return int(number)
 
+class Schematic:
+    __slots__ = ("grid", "_num_mask", "_labels", "_values", "_part_labels")
 
-def extract_numbers(coords):
-    for row, col in coords:
-        yield extract_contiguous_number(row, col)
+    def __init__(self, grid: np.ndarray) -> None:
+        self.grid = np.pad(grid, pad_width=1, mode="constant", constant_values=DOT)
+        self._num_mask = None
+        self._labels = None
+        self._values = None
+        self._part_labels = None
 
+    @classmethod
+    def from_bytes(cls, buffer: bytes) -> Schematic:
+        return cls(byte_grid(buffer))
 
-def solve_p1():
-    mask = sym_mask(grid)
-    adjacent_coords = drop_contiguous_points(adjacent_number_coords(mask))
-    unique_contiguous_numbers = extract_numbers(adjacent_coords)
-    return sum(unique_contiguous_numbers)
+    @classmethod
+    def from_string(cls, data: str) -> Schematic:
+        return cls.from_bytes(data.encode())
 
+    @property
+    def num_mask(self) -> np.ndarray:
+        if self._num_mask is None:
+            self._num_mask = digit_mask(self.grid)
+        return self._num_mask
 
-def extract_gear_ratio(coord):
-    mask = np.full(grid.shape, False)
-    mask[tuple(coord)] = True
-    components = list(
-        extract_numbers(drop_contiguous_points(adjacent_number_coords(mask)))
+    def _label(self) -> None:
+        self._labels, self._values = label_numbers(self.grid, self.num_mask)
+
+    @property
+    def labels(self) -> np.ndarray:
+        if self._labels is None:
+            self._label()
+        return self._labels
+
+    @property
+    def values(self) -> np.ndarray:
+        if self._values is None:
+            self._label()
+        return self._values
+
+    @property
+    def part_labels(self) -> np.ndarray:
+        if self._part_labels is None:
+            from scipy.ndimage import binary_dilation
+
+            near_symbol = binary_dilation(
+                sym_mask(self.grid), structure=np.ones((3, 3), dtype=bool)
+            )
+            self._part_labels = np.unique(self.labels[near_symbol & self.num_mask])
+        return self._part_labels
+
+    def gear_ratios(self, rows: slice = slice(None)) -> np.ndarray:
+        gear_coords = np.argwhere(gear_mask(self.grid[rows]))
+        gear_coords[:, 0] += rows.indices(len(self.grid))[0]
+        return gear_ratios(self.labels, self.values, gear_coords)
+
+    def solve_p1(self, rows: slice = slice(None)) -> int:
+        part_labels = self.part_labels
+        if rows != slice(None):
+            part_labels = np.intersect1d(part_labels, self.labels[rows])
+        return int(self.values[part_labels].sum())
+
+    def solve_p2(self, rows: slice = slice(None)) -> int:
+        return int(self.gear_ratios(rows).sum())
+
+
+def solve_p1(data: str) -> int:
+    return Schematic.from_string(data).solve_p1()
+
+
+def solve_p2(data: str) -> int:
+    return Schematic.from_string(data).solve_p2()
+
+
+def solve_band(grid: np.ndarray, start: int, stop: int) -> tuple[int, int]:
+    halo_start, halo_stop = max(start - 1, 0), min(stop + 1, len(grid))
+    schematic = Schematic(grid[halo_start:halo_stop])
+    rows = slice(start - halo_start + 1, stop - halo_start + 1)
+    return schematic.solve_p1(rows), schematic.solve_p2(rows)
+
+
+def merge_bands(results: Iterable[tuple[int, int]]) -> tuple[int, int]:
+    total_p1, total_p2 = 0, 0
+    for p1, p2 in results:
+        total_p1 += p1
+        total_p2 += p2
+    return total_p1, total_p2
+
+
+def solve_buffer(
+    buffer: bytes | mmap.mmap, band_rows: int = 1 << 12
+) -> tuple[int, int]:
+    grid = byte_grid(buffer)
+    return merge_bands(
+        solve_band(grid, start, min(start + band_rows, len(grid)))
+        for start in range(0, len(grid), band_rows)
     )
-    if len(components) == 2:
-        return np.prod(components)
-    return 0
 
 
-def solve_p2():
-    mask = gear_mask(grid)
-    gear_coords = np.argwhere(mask)
-    return sum(extract_gear_ratio(gear_coord) for gear_coord in gear_coords)
+def solve_file_band(path: str | os.PathLike, start: int, stop: int) -> tuple[int, int]:
+    with open(path, "rb") as file:
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            return solve_band(byte_grid(buffer), start, stop)
+
+
+def solve_file(
+    path: str | os.PathLike,
+    band_rows: int = 1 << 12,
+    executor: Executor | None = None,
+) -> tuple[int, int]:
+    size = os.path.getsize(path)
+    if not size:
+        return 0, 0
+    with open(path, "rb") as file:
+        n_rows, _, _ = row_layout(file.readline(), size)
+    starts = range(0, n_rows, band_rows)
+    stops = [min(start + band_rows, n_rows) for start in starts]
+    mapper = map if executor is None else executor.map
+    return merge_bands(mapper(solve_file_band, repeat(path), starts, stops))
+
+
+PUZZLE = Puzzle(day=3)
 
 
-grid = np.array(list(map(list, data.splitlines())))
-grid = np.pad(grid, pad_width=1, mode="constant", constant_values=".")
-num_mask = np.char.isdigit(grid)
-answer_p1 = solve_p1()
-submit(answer_p1, part="a")
+if __name__ == "__main__":
+    schematic = Schematic.from_string(PUZZLE.data)
 
-answer_p2 = solve_p2()
-submit(answer_p2, part="b")
+    PUZZLE.submit(schematic.solve_p1(), part="a")
+    PUZZLE.submit(schematic.solve_p2(), part="b")
@@ -1,44 +1,136 @@
-from collections import defaultdict
-from dotenv import load_dotenv
+from collections import deque
+from typing import Generator, Iterable, Sequence
+import re
 
-load_dotenv()
+import numpy as np
 
-from aocd import data, submit
+from solutions.puzzle import Puzzle
 
+CARD_PATTERN = re.compile(r"Card +\d+:")
 
-def parse_line(line):
+
+def split_line(line):
     _, cards = line.split(": ")
     winning, yours = cards.split(" | ")
-    return set(map(int, winning.split())), set(map(int, yours.split()))
+    return winning.split(), yours.split()
+
+
+def parse_line(line):
+    winning, yours = split_line(line)
+    return set(map(int, winning)), set(map(int, yours))
 
 
 def parse(data):
     yield from (parse_line(line) for line in data.splitlines())
 
 
+def bitmask(numbers: Iterable[int]) -> int:
+    mask = 0
+    for number in numbers:
+        mask |= 1 << number
+    return mask
+
+
+def parse_line_bits(line: str) -> tuple[int, int]:
+    winning, yours = split_line(line)
+    return bitmask(map(int, winning)), bitmask(map(int, yours))
+
+
+def parse_bits(data: str) -> Generator[tuple[int, int], None, None]:
+    yield from (parse_line_bits(line) for line in data.splitlines())
+
+
+def card_matrices(data: str) -> tuple[np.ndarray, np.ndarray]:
+    text = CARD_PATTERN.sub(" -1 ", data).replace("|", "-1")
+    tokens = np.fromstring(text, dtype=np.int64, sep=" ")
+    separators = tokens < 0
+    cards, sides = np.divmod(np.cumsum(separators)[~separators] - 1, 2)
+    numbers = tokens[~separators]
+    width = int(numbers.max(initial=-1)) + 1
+    matrices = np.zeros((2, np.count_nonzero(separators) // 2, width), dtype=bool)
+    matrices[sides, cards, numbers] = True
+    return matrices[0], matrices[1]
+
+
 def n_matches(winning, yours):
     return len(winning & yours)
 
 
+def n_matches_bits(winning: int, yours: int) -> int:
+    return (winning & yours).bit_count()
+
+
+def match_counts(data: str) -> np.ndarray:
+    winning, yours = card_matrices(data)
+    counts = np.count_nonzero(winning & yours, axis=1)
+    return counts.astype(np.min_scalar_type(winning.shape[1]))
+
+
+def stream_match_counts(lines: Iterable[str]) -> Generator[int, None, None]:
+    for line in lines:
+        if line.strip():
+            yield n_matches_bits(*parse_line_bits(line))
+
+
 def score_p1(winning, yours):
     return int(2 ** (n_matches(winning, yours) - 1))
 
 
+def score_bits_p1(winning: int, yours: int) -> int:
+    return (1 << n_matches_bits(winning, yours)) >> 1
+
+
+def score_counts(counts: np.ndarray) -> int:
+    counts = np.asarray(counts, dtype=np.int64)
+    if counts.max(initial=0) + len(counts).bit_length() < 63:
+        return int(((1 << counts) >> 1).sum())
+    return sum((1 << n_matched) >> 1 for n_matched in counts.tolist())
+
+
 def solve_p1(data):
-    return sum(score_p1(*line) for line in parse(data))
+    return score_counts(match_counts(data))
+
+
+def propagate_copies(matches: Sequence[int]) -> int:
+    n_cards = len(matches)
+    pending = [0] * (n_cards + 1)
+    running, total = 0, 0
+    for i, n_matched in enumerate(matches):
+        running += pending[i]
+        pending[i] = 0
+        copies = running + 1
+        total += copies
+        if n_matched:
+            running += copies
+            pending[min(i + 1 + n_matched, n_cards)] -= copies
+    return total
 
 
 def solve_p2(data):
-    copies = defaultdict(lambda: 1)
+    return propagate_copies(match_counts(data).tolist())
 
-    for i, (winning, yours) in enumerate(parse(data)):
-        for j in range(i + 1, i + 1 + n_matches(winning, yours)):
-            copies[j] += copies[i]
-        copies[i]  # ensure current card is counted
 
-    return sum(copies.values())
+def solve_stream(lines: Iterable[str]) -> tuple[int, int]:
+    pending = deque()
+    running, total_p1, total_p2 = 0, 0, 0
+    for n_matched in stream_match_counts(lines):
+        if pending:
+            running -= pending.popleft()
+        copies = running + 1
+        total_p1 += (1 << n_matched) >> 1
+        total_p2 += copies
+        if n_matched:
+            running += copies
+            pending.extend([0] * (n_matched + 1 - len(pending)))
+            pending[n_matched] += copies
+    return total_p1, total_p2
+
+
+PUZZLE = Puzzle(day=4)
 
 
 if __name__ == "__main__":
-    submit(solve_p1(data), part=1)
-    submit(solve_p2(data), part=2)
+    counts = match_counts(PUZZLE.data)
+
+    PUZZLE.submit(score_counts(counts), part=1)
+    PUZZLE.submit(propagate_copies(counts.tolist()), part=2)
@@ -1,12 +1,15 @@
+from __future__ import annotations
+from array import array
 from collections import defaultdict
 import enum
-from typing import Generator
+from typing import IO, TYPE_CHECKING, Generator, Iterable
 
-from dotenv import load_dotenv
+import numpy as np
 
-load_dotenv()
+from solutions.puzzle import Puzzle
 
-from aocd import data, submit
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
 
 
 class Category(enum.Enum):
@@ -24,6 +27,276 @@ MappingCategories = tuple[Category, Category]
 MappingRanges = tuple[range, range]
 Mappings = dict[MappingCategories, list[MappingRanges]]
 Changeovers = dict[int, int]
+MappingArrays = tuple[np.ndarray, np.ndarray, np.ndarray]
+MappingTables = dict[MappingCategories, "MappingTable"]
+
+
+def read_only(array: np.ndarray) -> np.ndarray:
+    array.flags.writeable = False
+    return array
+
+
+def overlapping(starts: np.ndarray, stops: np.ndarray) -> bool:
+    order = np.argsort(starts)
+    reach = np.maximum.accumulate(stops[order])
+    return bool(np.any(starts[order][1:] < reach[:-1]))
+
+
+class ChangeoverMap:
+    __slots__ = ("_starts", "_deltas", "_inverse")
+
+    def __init__(self, starts: np.ndarray, deltas: np.ndarray) -> None:
+        self._starts = read_only(np.array(starts, dtype=np.int64))
+        self._deltas = read_only(np.array(deltas, dtype=np.int64))
+        self._inverse = None
+
+    @property
+    def starts(self) -> np.ndarray:
+        return self._starts
+
+    @property
+    def deltas(self) -> np.ndarray:
+        return self._deltas
+
+    def __setitem__(self, start: int, delta: int) -> None:
+        i = np.searchsorted(self._starts, start)
+        if i < len(self._starts) and self._starts[i] == start:
+            deltas = self._deltas.copy()
+            deltas[i] = delta
+            self._deltas = read_only(deltas)
+        else:
+            self._starts = read_only(np.insert(self._starts, i, start))
+            self._deltas = read_only(np.insert(self._deltas, i, delta))
+        self._invalidate()
+
+    def __delitem__(self, start: int) -> None:
+        i = np.searchsorted(self._starts, start)
+        if i == len(self._starts) or self._starts[i] != start:
+            raise KeyError(start)
+        self._starts = read_only(np.delete(self._starts, i))
+        self._deltas = read_only(np.delete(self._deltas, i))
+        self._invalidate()
+
+    def _invalidate(self) -> None:
+        if self._inverse is not None:
+            self._inverse._inverse = None
+            self._inverse = None
+
+    def inverse(self) -> ChangeoverMap:
+        if self._inverse is None:
+            images = self._starts + self._deltas
+            order = np.argsort(images)
+            inverse = ChangeoverMap.deduped(images[order], -self._deltas[order])
+            inverse._inverse = self
+            self._inverse = inverse
+        return self._inverse
+
+    @classmethod
+    def from_changeovers(cls, changeovers: Changeovers) -> ChangeoverMap:
+        starts = sorted(changeovers.keys())
+        return cls(starts, [changeovers[start] for start in starts])
+
+    @classmethod
+    def from_mapping(cls, mapping: list[MappingRanges] | MappingTable) -> ChangeoverMap:
+        if isinstance(mapping, MappingTable):
+            return cls.from_arrays(
+                mapping.source_starts, mapping.dest_starts, mapping.lengths
+            )
+        return cls.from_arrays(
+            np.array([source.start for source, _ in mapping], np.int64),
+            np.array([dest.start for _, dest in mapping], np.int64),
+            np.array([len(source) for source, _ in mapping], np.int64),
+        )
+
+    @classmethod
+    def from_arrays(
+        cls, source_starts: np.ndarray, dest_starts: np.ndarray, lengths: np.ndarray
+    ) -> ChangeoverMap:
+        non_empty = np.asarray(lengths) > 0
+        source_starts = np.asarray(source_starts, dtype=np.int64)[non_empty]
+        dest_starts = np.asarray(dest_starts, dtype=np.int64)[non_empty]
+        source_stops = source_starts + np.asarray(lengths, dtype=np.int64)[non_empty]
+        if overlapping(source_starts, source_stops):
+            return cls.from_overlapping(
+                source_starts, source_stops, dest_starts - source_starts
+            )
+
+        starts = np.concatenate(([0], source_stops, source_starts))
+        deltas = np.concatenate(
+            ([0], np.zeros_like(source_stops), dest_starts - source_starts)
+        )
+        order = np.argsort(starts, kind="stable")
+        starts, deltas = starts[order], deltas[order]
+        last_of_each = np.concatenate((starts[1:] != starts[:-1], [True]))
+        return cls.deduped(starts[last_of_each], deltas[last_of_each])
+
+    @classmethod
+    def from_overlapping(
+        cls, source_starts: np.ndarray, source_stops: np.ndarray, deltas: np.ndarray
+    ) -> ChangeoverMap:
+        # follow_one lets the first matching line win, so paint each line's
+        # span of elementary intervals from the last line back to the first.
+        starts = np.unique(np.concatenate(([0], source_starts, source_stops)))
+        lines = np.full(len(starts), len(deltas))
+        firsts = np.searchsorted(starts, source_starts)
+        lasts = np.searchsorted(starts, source_stops)
+        for line in range(len(deltas) - 1, -1, -1):
+            lines[firsts[line] : lasts[line]] = line
+        return cls.deduped(starts, np.append(deltas, 0)[lines])
+
+    @classmethod
+    def deduped(cls, starts: np.ndarray, deltas: np.ndarray) -> ChangeoverMap:
+        keep = np.ones(len(deltas), dtype=bool)
+        keep[1:] = deltas[1:] != deltas[:-1]
+        return cls(starts[keep], deltas[keep])
+
+    def to_changeovers(self) -> Changeovers:
+        return dict(zip(self.starts.tolist(), self.deltas.tolist()))
+
+    def delta(self, source: int | np.ndarray) -> int | np.ndarray:
+        if not len(self.starts):
+            return np.zeros_like(source)
+        i = np.searchsorted(self.starts, source, side="right")
+        return np.where(i > 0, self.deltas[i - 1], 0)
+
+    def follow(
+        self, source: int | np.ndarray, reverse: bool = False
+    ) -> int | np.ndarray:
+        if reverse:
+            return self.inverse().follow(source)
+        return source + self.delta(source)
+
+    def follow_ranges(
+        self, starts: np.ndarray, stops: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        if not len(self.starts):
+            return starts, stops
+
+        first = np.searchsorted(self.starts, starts, side="right")
+        counts = np.searchsorted(self.starts, stops, side="left") - first + 1
+        ranges = np.repeat(np.arange(len(starts)), counts)
+        pieces = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        breakpoints = first[ranges] + pieces
+        last_breakpoint = len(self.starts) - 1
+
+        piece_starts = np.where(
+            pieces == 0,
+            starts[ranges],
+            self.starts[np.maximum(breakpoints - 1, 0)],
+        )
+        piece_stops = np.where(
+            pieces == counts[ranges] - 1,
+            stops[ranges],
+            self.starts[np.minimum(breakpoints, last_breakpoint)],
+        )
+        deltas = np.concatenate(([0], self.deltas))[breakpoints]
+        return piece_starts + deltas, piece_stops + deltas
+
+    def compose(self, other: ChangeoverMap) -> ChangeoverMap:
+        if not len(self.starts):
+            return ChangeoverMap(other.starts.copy(), other.deltas.copy())
+
+        images = self.starts + self.deltas
+        n_other = len(other.starts)
+        piece_deltas = np.concatenate(([0], self.deltas))
+        first_inside = np.concatenate(
+            ([0], np.searchsorted(other.starts, images, side="right"))
+        )
+        first_after = np.concatenate(
+            (
+                np.searchsorted(other.starts, self.starts[:1], side="left"),
+                np.searchsorted(other.starts, self.starts[1:] + self.deltas[:-1]),
+                [n_other],
+            )
+        )
+        counts = first_after - first_inside
+        pieces = np.repeat(np.arange(len(counts)), counts)
+        offsets = np.cumsum(counts) - counts
+        inside = np.arange(counts.sum()) - np.repeat(offsets - first_inside, counts)
+
+        # Locating the pieces costs two searchsorted passes over other.starts,
+        # O(n log m) in all. Piece p's breakpoints then fall strictly between
+        # self.starts[p - 1] and self.starts[p], so the merged positions are
+        # known without sorting and the merge itself is linear.
+        other_deltas = np.concatenate(([0], other.deltas))
+        own_positions = np.arange(len(self.starts)) + np.cumsum(counts)[:-1]
+        inserted_positions = np.arange(len(inside)) + pieces
+        starts = np.empty(len(self.starts) + len(inside), dtype=np.int64)
+        deltas = np.empty_like(starts)
+        starts[own_positions] = self.starts
+        starts[inserted_positions] = other.starts[inside] - piece_deltas[pieces]
+        deltas[own_positions] = self.deltas + other_deltas[first_inside[1:]]
+        deltas[inserted_positions] = piece_deltas[pieces] + other.deltas[inside]
+        return ChangeoverMap.deduped(starts, deltas)
+
+
+class MappingTable:
+    __slots__ = ("_source_starts", "_dest_starts", "_lengths", "_changeover_maps")
+
+    def __init__(
+        self, source_starts: np.ndarray, dest_starts: np.ndarray, lengths: np.ndarray
+    ) -> None:
+        self._source_starts = read_only(np.array(source_starts, dtype=np.int64))
+        self._dest_starts = read_only(np.array(dest_starts, dtype=np.int64))
+        self._lengths = read_only(np.array(lengths, dtype=np.int64))
+        self._changeover_maps = {}
+
+    @property
+    def source_starts(self) -> np.ndarray:
+        return self._source_starts
+
+    @property
+    def dest_starts(self) -> np.ndarray:
+        return self._dest_starts
+
+    @property
+    def lengths(self) -> np.ndarray:
+        return self._lengths
+
+    @classmethod
+    def from_ranges(cls, mapping: list[MappingRanges]) -> MappingTable:
+        return cls(
+            [source.start for source, _ in mapping],
+            [dest.start for _, dest in mapping],
+            [len(source) for source, _ in mapping],
+        )
+
+    @classmethod
+    def from_changeovers(cls, changeovers: Changeovers) -> MappingTable:
+        changeover_map = ChangeoverMap.from_changeovers(changeovers)
+        starts, deltas = changeover_map.starts, changeover_map.deltas
+        moved = np.flatnonzero(deltas[:-1])
+        return cls(
+            starts[moved],
+            starts[moved] + deltas[moved],
+            starts[moved + 1] - starts[moved],
+        )
+
+    def __len__(self) -> int:
+        return len(self.lengths)
+
+    def __iter__(self) -> Generator[MappingRanges, None, None]:
+        for source, dest, length in zip(
+            self.source_starts.tolist(),
+            self.dest_starts.tolist(),
+            self.lengths.tolist(),
+        ):
+            yield range(source, source + length), range(dest, dest + length)
+
+    def _changeover_map(self, reverse: bool) -> ChangeoverMap:
+        if reverse not in self._changeover_maps:
+            starts, dests = self.source_starts, self.dest_starts
+            if reverse:
+                starts, dests = dests, starts
+            self._changeover_maps[reverse] = ChangeoverMap.from_arrays(
+                starts, dests, self.lengths
+            )
+        return self._changeover_maps[reverse]
+
+    def follow(
+        self, source: int | np.ndarray, reverse: bool = False
+    ) -> int | np.ndarray:
+        return self._changeover_map(reverse).follow(source)
 
 
 def parse_p1(
@@ -72,9 +345,53 @@ def parse_lines(lines: list[str]) -> Mappings:
     return mappings
 
 
+def parse_stream(
+    file: IO,
+) -> tuple[np.ndarray, Generator[tuple[MappingCategories, MappingArrays], None, None]]:
+    seeds = file.readline().split()[1:]
+    return np.fromiter(map(int, seeds), dtype=np.int64), parse_blocks(file)
+
+
+def parse_blocks(
+    file: IO,
+) -> Generator[tuple[MappingCategories, MappingArrays], None, None]:
+    current_categories = None
+    columns = array("q"), array("q"), array("q")
+    while line := file.readline():
+        match line.split():
+            case [dest_start, source_start, range_length]:
+                columns[0].append(int(source_start))
+                columns[1].append(int(dest_start))
+                columns[2].append(int(range_length))
+            case [categories, _]:
+                if current_categories is not None:
+                    yield current_categories, block_arrays(columns)
+                    columns = array("q"), array("q"), array("q")
+                if isinstance(categories, bytes):
+                    categories = categories.decode()
+                start, end = categories.split("-to-")
+                current_categories = Category[start.upper()], Category[end.upper()]
+    if current_categories is not None:
+        yield current_categories, block_arrays(columns)
+
+
+def parse_tables(file: IO) -> tuple[np.ndarray, MappingTables]:
+    seeds, blocks = parse_stream(file)
+    return seeds, {
+        categories: MappingTable(*mapping_arrays)
+        for categories, mapping_arrays in blocks
+    }
+
+
+def block_arrays(columns: tuple[array, array, array]) -> MappingArrays:
+    return tuple(np.frombuffer(column, dtype=np.int64) for column in columns)
+
+
 def follow_one(
-    source: int, mapping_ranges: MappingRanges, reverse: bool = False
+    source: int, mapping_ranges: MappingRanges | MappingTable, reverse: bool = False
 ) -> int:
+    if isinstance(mapping_ranges, MappingTable):
+        return int(mapping_ranges.follow(source, reverse=reverse))
     for ranges in mapping_ranges:
         source_range, dest_range = ranges[::-1] if reverse else ranges
         if source in source_range:
@@ -83,15 +400,13 @@ def follow_one(
 
 
 def follow_from_changeovers(
-    source: int, changeovers: Changeovers, reverse: bool = False
+    source: int, changeovers: Changeovers | ChangeoverMap, reverse: bool = False
 ) -> int:
-    if reverse:
-        return follow_from_changeovers(source, invert_changeovers(changeovers))
-    keys = sorted(changeovers.keys())
-    for start, end in zip(keys, keys[1:]):
-        if start <= source < end:
-            return source + changeovers[start]
-    return source + changeovers[end]
+    if not isinstance(changeovers, ChangeoverMap):
+        # A dict is sorted into a fresh map on every call; callers that follow
+        # many sources should convert once with ChangeoverMap.from_changeovers.
+        changeovers = ChangeoverMap.from_changeovers(changeovers)
+    return int(changeovers.follow(source, reverse=reverse))
 
 
 def invert_changeovers(changeovers: Changeovers) -> Changeovers:
@@ -109,6 +424,13 @@ def follow_p1(
     return source
 
 
+def follow_p1_batch(seeds: np.ndarray, mappings: Mappings) -> np.ndarray:
+    locations = np.asarray(seeds, dtype=np.int64)
+    for changeover_map in find_all_changeover_maps(mappings):
+        locations = changeover_map.follow(locations)
+    return locations
+
+
 def delta_mappings(source: int, mapping_ranges: MappingRanges) -> int:
     return follow_one(source, mapping_ranges) - source
 
@@ -124,14 +446,9 @@ def dedup_changeovers(changeovers: Changeovers) -> Changeovers:
 
 
 def find_changeovers(
-    mapping: MappingRanges,
+    mapping: list[MappingRanges] | MappingTable,
 ) -> Changeovers:
-    changeovers = {0: 0}
-    for source_range, _ in mapping:
-        changeovers[source_range.start] = delta_mappings(source_range.start, mapping)
-        changeovers[source_range.stop] = delta_mappings(source_range.stop, mapping)
-
-    return dedup_changeovers(changeovers)
+    return ChangeoverMap.from_mapping(mapping).to_changeovers()
 
 
 def changeovers_to_mappings(changeovers: Changeovers) -> MappingRanges:
@@ -148,45 +465,101 @@ def find_all_changeovers(mappings: Mappings) -> Generator[Changeovers, None, Non
         yield find_changeovers(mapping)
 
 
-def compose_changeovers(*changeovers) -> Changeovers:
-    if len(changeovers) > 2:
-        return compose_changeovers(
-            compose_changeovers(changeovers[0], changeovers[1]), *changeovers[2:]
-        )
+def find_all_changeover_maps(
+    mappings: Mappings,
+) -> Generator[ChangeoverMap, None, None]:
+    for mapping in mappings.values():
+        yield ChangeoverMap.from_mapping(mapping)
+
+
+def compose_changeover_maps(
+    changeover_maps: Iterable[ChangeoverMap], executor: Executor | None = None
+) -> ChangeoverMap:
+    level = list(changeover_maps)
+    if not level:
+        return ChangeoverMap([], [])
 
-    first, second = changeovers
-    changeovers = {}
-    for source in sorted(first.keys()):
-        dest = follow_from_changeovers(source, first)
-        delta = follow_from_changeovers(dest, second) - source
-        changeovers[source] = delta
+    while len(level) > 1:
+        firsts, seconds = level[0::2], level[1::2]
+        if executor is None:
+            composed = [first.compose(second) for first, second in zip(firsts, seconds)]
+        else:
+            composed = list(executor.map(ChangeoverMap.compose, firsts, seconds))
+        if len(firsts) > len(seconds):
+            composed.append(firsts[-1])
+        level = composed
+    return level[0]
 
-    for key in sorted(second.keys()):
-        source = follow_from_changeovers(key, first, reverse=True)
-        dest = follow_from_changeovers(key, second)
-        delta = dest - source
-        changeovers[source] = delta
 
-    return dedup_changeovers(changeovers)
+def compose_all_changeovers(
+    mappings: Mappings, executor: Executor | None = None
+) -> ChangeoverMap:
+    return compose_changeover_maps(find_all_changeover_maps(mappings), executor)
+
+
+def compose_changeovers(
+    *changeovers: Changeovers, executor: Executor | None = None
+) -> Changeovers:
+    changeover_maps = map(ChangeoverMap.from_changeovers, changeovers)
+    return compose_changeover_maps(changeover_maps, executor).to_changeovers()
+
+
+def merge_ranges(
+    starts: np.ndarray, stops: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    non_empty = starts < stops
+    starts, stops = starts[non_empty], stops[non_empty]
+    if not len(starts):
+        return starts, stops
+    order = np.argsort(starts)
+    starts, stops = starts[order], stops[order]
+    reach = np.maximum.accumulate(stops)
+    new_group = np.concatenate(([True], starts[1:] > reach[:-1]))
+    group_ends = np.concatenate((np.flatnonzero(new_group)[1:] - 1, [len(starts) - 1]))
+    return starts[new_group], reach[group_ends]
 
 
 def solve_p1(data: str) -> int:
     seeds, mappings = parse_p1(data)
-    return min(follow_p1(seed, mappings) for seed in seeds)
+    return int(follow_p1_batch(seeds, mappings).min())
+
+
+def solve_p1_stream(file: IO) -> int:
+    locations, blocks = parse_stream(file)
+    for _, mapping_arrays in blocks:
+        locations = ChangeoverMap.from_arrays(*mapping_arrays).follow(locations)
+    return int(locations.min())
 
 
 def solve_p2(data: str) -> int:
     seed_ranges, mappings = parse_p2(data)
-    changeovers = compose_changeovers(*find_all_changeovers(mappings))
-    keys = sorted(changeovers.keys())
+    bounds = np.array(
+        [(seed_range.start, seed_range.stop) for seed_range in seed_ranges],
+        dtype=np.int64,
+    ).reshape(-1, 2)
+    starts, stops = merge_ranges(bounds[:, 0], bounds[:, 1])
+    for changeover_map in find_all_changeover_maps(mappings):
+        starts, stops = merge_ranges(*changeover_map.follow_ranges(starts, stops))
+    return int(starts[0]) if len(starts) else float("inf")
+
+
+def solve_p2_changeovers(data: str) -> int:
+    seed_ranges, mappings = parse_p2(data)
+    changeovers = compose_all_changeovers(mappings)
+    keys = changeovers.starts.tolist()
     minimum = float("inf")
-    for seed_range in seed_ranges:
+    for seed_range in filter(None, seed_ranges):
         keys_to_use = [key for key in keys if key in seed_range] + [seed_range.start]
         for key in keys_to_use:
-            minimum = min(minimum, follow_from_changeovers(key, changeovers))
+            minimum = min(minimum, int(changeovers.follow(key)))
     return minimum
 
 
+PUZZLE = Puzzle(day=5)
+
+
 if __name__ == "__main__":
-    submit(solve_p1(data), part=1)
-    submit(solve_p2(data), part=2)
+    data = PUZZLE.data
+
+    PUZZLE.submit(solve_p1(data), part=1)
+    PUZZLE.submit(solve_p2(data), part=2)
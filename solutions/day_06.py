@@ -1,11 +1,9 @@
 import math
 import re
 
-from dotenv import load_dotenv
+import numpy as np
 
-load_dotenv()
-
-from aocd import data, submit
+from solutions.puzzle import Puzzle
 
 
 def parse_p1(data: str) -> tuple[list[int], list[int]]:
@@ -22,22 +20,82 @@ def parse_p2(data: str) -> tuple[int, int]:
     return total_time, distance
 
 
-def roots(total_time: int, record: int) -> tuple[float, float]:
-    disc_root = math.sqrt(total_time**2 - 4 * record)
-    return (total_time - disc_root) / 2, (total_time + disc_root) / 2
+FLOAT_EXACT_LIMIT = 1 << 52
+BATCH_TIME_LIMIT = 1 << 31
+BATCH_RECORD_LIMIT = 1 << 60
+
+
+def floor_sqrt(n: int) -> int:
+    if n < FLOAT_EXACT_LIMIT:
+        return int(math.sqrt(n))
+    return math.isqrt(n)
+
+
+def first_win(total_time: int, record: int) -> int | None:
+    discriminant = total_time**2 - 4 * record
+    if discriminant < 0:
+        return None
+    hold = (total_time - floor_sqrt(discriminant)) // 2
+    if hold * (total_time - hold) <= record:
+        hold += 1
+    return max(hold, 0)
 
 
 def ways_to_win(total_time: int, record: int) -> int:
-    lower, upper = roots(total_time, record)
-    min_score = math.ceil(lower) if int(lower) != lower else lower + 1
-    max_score = math.floor(upper) if int(upper) != upper else upper - 1
-    return max_score - min_score + 1
+    hold = first_win(total_time, record)
+    if hold is None:
+        return 0
+    return max(total_time - 2 * hold + 1, 0)
+
+
+def fits_batch(times: np.ndarray, records: np.ndarray) -> bool:
+    return (
+        times.dtype.kind in "iu"
+        and records.dtype.kind in "iu"
+        and np.abs(times).max(initial=0) < BATCH_TIME_LIMIT
+        and np.abs(records).max(initial=0) < BATCH_RECORD_LIMIT
+    )
+
+
+def ways_to_win_batch(times: np.ndarray, records: np.ndarray) -> np.ndarray:
+    times, records = np.broadcast_arrays(np.asarray(times), np.asarray(records))
+    if not fits_batch(times, records):
+        return np.array(
+            [
+                ways_to_win(*race)
+                for race in zip(times.ravel().tolist(), records.ravel().tolist())
+            ],
+            dtype=object,
+        ).reshape(times.shape)
+    times = times.astype(np.int64)
+    records = records.astype(np.int64)
+    discriminants = times * times - 4 * records
+    roots = np.sqrt(np.maximum(discriminants, 0)).astype(np.int64)
+    roots -= roots * roots > discriminants
+    roots += (roots + 1) * (roots + 1) <= discriminants
+    holds = (times - roots) // 2
+    holds += holds * (times - holds) <= records
+    holds = np.maximum(holds, 0)
+    ways = np.maximum(times - 2 * holds + 1, 0)
+    ways[discriminants < 0] = 0
+    return ways
+
+
+def product(ways: np.ndarray) -> int:
+    if ways.dtype != object and np.log2(np.maximum(ways, 1)).sum() < 62:
+        return int(np.prod(ways))
+    return math.prod(ways.ravel().tolist())
+
+
+def solve_batch(times: np.ndarray, records: np.ndarray) -> tuple[np.ndarray, int]:
+    ways = ways_to_win_batch(times, records)
+    return ways, product(ways)
 
 
 def solve_p1(data: str) -> int:
-    return math.prod(
-        ways_to_win(total_time, record) for total_time, record in parse_p1(data)
-    )
+    times, records = zip(*parse_p1(data))
+    _, answer = solve_batch(np.array(times), np.array(records))
+    return answer
 
 
 def solve_p2(data: str) -> int:
@@ -45,6 +103,11 @@ def solve_p2(data: str) -> int:
     return ways_to_win(total_time, record)
 
 
+PUZZLE = Puzzle(day=6)
+
+
 if __name__ == "__main__":
-    submit(solve_p1(data), part=1)
-    submit(solve_p2(data), part=2)
+    data = PUZZLE.data
+
+    PUZZLE.submit(solve_p1(data), part=1)
+    PUZZLE.submit(solve_p2(data), part=2)
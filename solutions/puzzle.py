@@ -0,0 +1,32 @@
+from __future__ import annotations
+from types import ModuleType
+
+YEAR = 2023
+
+
+def load_aocd() -> ModuleType:
+    from dotenv import load_dotenv
+
+    load_dotenv()
+
+    import aocd
+
+    return aocd
+
+
+class Puzzle:
+    __slots__ = ("day", "year", "_data")
+
+    def __init__(self, day: int, year: int = YEAR) -> None:
+        self.day = day
+        self.year = year
+        self._data = None
+
+    @property
+    def data(self) -> str:
+        if self._data is None:
+            self._data = load_aocd().get_data(day=self.day, year=self.year)
+        return self._data
+
+    def submit(self, answer: int, part: str | int) -> None:
+        load_aocd().submit(answer, part=part, day=self.day, year=self.year)
@@ -3,10 +3,16 @@ from textwrap import dedent
 import pytest
 
 from solutions.day_01 import (
+    calibration_value_p1,
+    calibration_value_p2,
     parse,
+    parse_calibration,
+    solve_buffer_p1,
+    solve_file_p1,
     extract_digits_p1,
     extract_digits_p2,
     extract_number,
+    make_digit_extractor,
     solve,
 )
 
@@ -61,12 +67,30 @@ def test_extract_digits_p1(line, expected):
         ("4nineeightseven2", [4, 9, 8, 7, 2]),
         ("zoneight234", [1, 8, 2, 3, 4]),
         ("7pqrstsixteen", [7, 6]),
+        ("oneight", [1, 8]),
+        ("twone", [2, 1]),
+        ("sevenine", [7, 9]),
+        ("nineeight", [9, 8]),
+        ("", []),
     ],
 )
 def test_extract_digits_p2(line, expected):
     assert list(extract_digits_p2(line)) == expected
 
 
+@pytest.mark.parametrize(
+    ["line", "expected"],
+    [
+        ("unodostres", [1, 2, 3]),
+        ("xdoseisx", [2, 6]),
+        ("one2three", []),
+    ],
+)
+def test_make_digit_extractor(line, expected):
+    extract_digits = make_digit_extractor({"uno": 1, "dos": 2, "tres": 3, "seis": 6})
+    assert list(extract_digits(line)) == expected
+
+
 @pytest.mark.parametrize(
     ["digits", "expected"],
     [
@@ -90,6 +114,53 @@ def test_parse_p2(data_p2):
     assert list(parse(data_p2, extract_digits_p2)) == expected
 
 
+@pytest.mark.parametrize(
+    ["line", "expected"],
+    [
+        ("1abc2", 12),
+        ("pqr3stu8vwx", 38),
+        ("a1b2c3d4e5f", 15),
+        ("treb7uchet", 77),
+        ("one2three", 22),
+    ],
+)
+def test_calibration_value_p1(line, expected):
+    assert calibration_value_p1(line) == expected
+
+
+@pytest.mark.parametrize(
+    ["line", "expected"],
+    [
+        ("two1nine", 29),
+        ("eightwothree", 83),
+        ("zoneight234", 14),
+        ("7pqrstsixteen", 76),
+        ("oneight", 18),
+        ("xtwone", 21),
+        ("5", 55),
+    ],
+)
+def test_calibration_value_p2(line, expected):
+    assert calibration_value_p2(line) == expected
+
+
+def test_calibration_value_without_digits():
+    with pytest.raises(ValueError):
+        calibration_value_p1("abc")
+
+
+def test_parse_calibration_p1(data_p1):
+    assert list(parse_calibration(data_p1, calibration_value_p1)) == list(
+        parse(data_p1, extract_digits_p1)
+    )
+
+
+def test_parse_calibration_p2(data_p2):
+    assert list(parse_calibration(data_p2, calibration_value_p2)) == list(
+        parse(data_p2, extract_digits_p2)
+    )
+
+
 @pytest.mark.parametrize(
     ["numbers", "expected"],
     [
@@ -98,3 +169,27 @@ def test_parse_p2(data_p2):
 )
 def test_solve(numbers, expected):
     assert solve(numbers) == expected
+
+
+@pytest.mark.parametrize("chunk_size", [1, 5, 16, 1 << 26])
+@pytest.mark.parametrize("trailing_newline", [True, False])
+def test_solve_buffer_p1(data_p1, chunk_size, trailing_newline):
+    if not trailing_newline:
+        data_p1 = data_p1.rstrip("\n")
+    assert solve_buffer_p1(data_p1.encode(), chunk_size) == solve(
+        parse(data_p1, extract_digits_p1)
+    )
+
+
+def test_solve_buffer_p1_without_digits():
+    with pytest.raises(ValueError):
+        solve_buffer_p1(b"1abc2\nabc\n")
+
+
+def test_solve_file_p1(data_p1, tmp_path):
+    path = tmp_path / "calibration.txt"
+    path.write_text(data_p1)
+    assert solve_file_p1(path, chunk_size=8) == 142
+
+    path.write_text("")
+    assert solve_file_p1(path) == 0
@@ -3,15 +3,21 @@ from textwrap import dedent
 import pytest
 
 from solutions.day_02 import (
+    ColorRegistry,
     Cubes,
+    FastCubes,
+    FastGame,
     Game,
+    GameTable,
     parse,
     parse_draw,
     parse_draws,
     parse_game,
+    parse_table,
     power,
     solve_p1,
     solve_p2,
+    tokenize,
 )
 
 
@@ -103,6 +109,31 @@ def test_parse_game():
     assert parse_game(game_str) == expected
 
 
+def test_parse_strict(data):
+    games = list(parse(data, strict=True))
+    assert all(isinstance(game, Game) for game in games)
+    assert all(isinstance(draw, Cubes) for game in games for draw in game.draws)
+    assert games == list(parse(data))
+
+
+def test_parse_fast(data):
+    games = list(parse(data))
+    assert all(isinstance(game, FastGame) for game in games)
+    assert all(isinstance(draw, FastCubes) for game in games for draw in game.draws)
+
+
+@pytest.mark.parametrize(
+    ["draw", "expected"],
+    [
+        (FastCubes(red=4, blue=3), True),
+        (FastCubes(red=1, green=2, blue=20), False),
+        (FastCubes(green=2), True),
+    ],
+)
+def test_fast_cubes_possible(max_cubes, draw, expected):
+    assert draw.possible(max_cubes) == expected
+
+
 def test_parse(data):
     assert list(parse(data)) == [
         Game(
@@ -147,8 +178,9 @@ def test_parse(data):
     ]
 
 
-def test_solve_p1(data):
-    assert solve_p1(parse(data)) == 8
+@pytest.mark.parametrize("strict", [True, False])
+def test_solve_p1(data, strict):
+    assert solve_p1(parse(data, strict=strict)) == 8
 
 
 @pytest.mark.parametrize(
@@ -185,6 +217,222 @@ def test_power(cubes, expected):
     assert power(cubes) == expected
 
 
-def test_solve_p2(data):
+@pytest.mark.parametrize("strict", [True, False])
+def test_solve_p2(data, strict):
     expected = 2286
-    assert solve_p2(parse(data)) == expected
+    assert solve_p2(parse(data, strict=strict)) == expected
+
+
+def test_parse_table(data):
+    table = parse_table(data)
+    assert table.ids.tolist() == [1, 2, 3, 4, 5]
+    assert table.offsets.tolist() == [0, 3, 6, 9, 12]
+    assert table.red.tolist() == [4, 1, 0, 0, 1, 0, 20, 4, 1, 3, 6, 14, 6, 1]
+    assert table.green.tolist() == [0, 2, 2, 2, 3, 1, 8, 13, 5, 1, 3, 3, 3, 2]
+    assert table.blue.tolist() == [3, 6, 0, 1, 4, 1, 6, 5, 0, 6, 0, 15, 1, 2]
+
+
+def test_game_table_minimal_sets(data):
+    table = parse_table(data)
+    assert table.minimal_sets().tolist() == [
+        [game.minimal_set().red, game.minimal_set().green, game.minimal_set().blue]
+        for game in parse(data)
+    ]
+
+
+def test_game_table_possible(data, max_cubes):
+    table = parse_table(data)
+    assert table.possible(max_cubes).tolist() == [True, True, False, False, True]
+
+
+def test_game_table_powers(data):
+    assert parse_table(data).powers().tolist() == [48, 12, 1560, 630, 36]
+
+
+def test_game_table_from_games(data):
+    table = GameTable.from_games(parse(data, strict=True))
+    assert table.counts.tolist() == parse_table(data).counts.tolist()
+
+
+@pytest.mark.parametrize(
+    ["games", "expected"],
+    [
+        ([FastGame(1, []), FastGame(2, [FastCubes(red=20)])], 1),
+        ([FastGame(2, [FastCubes(red=20)]), FastGame(1, [])], 1),
+        ([FastGame(1, []), FastGame(3, [])], 4),
+    ],
+)
+def test_game_table_games_without_draws(games, expected):
+    table = GameTable.from_games(games)
+    assert table.minimal_sets().tolist() == [
+        FastCubes().registry.vector(game.minimal_set()) for game in games
+    ]
+    assert solve_p1(table) == solve_p1(games) == expected
+    assert solve_p2(table) == solve_p2(games) == 0
+
+
+def test_solve_table(data):
+    table = parse_table(data)
+    assert solve_p1(table) == 8
+    assert solve_p2(table) == 2286
+
+
+@pytest.fixture
+def data_many_colors():
+    return dedent(
+        """\
+        Game 1: 3 cyan, 4 red; 1 magenta, 2 green, 6 blue
+        Game 2: 2 cyan, 2 green, 1 red, 1 blue, 1 magenta; 5 yellow
+        """
+    )
+
+
+def test_color_registry():
+    registry = ColorRegistry()
+    assert list(registry) == ["red", "green", "blue"]
+    assert registry.index("cyan") == 3
+    assert registry.index("red") == 0
+    assert registry.index("cyan") == 3
+    assert len(registry) == 4
+    assert registry.vector({"cyan": 2, "green": 1}) == [0, 1, 0, 2]
+    assert registry.vector(Cubes(red=5)) == [5, 0, 0, 0]
+
+
+def test_parse_draw_unknown_color():
+    registry = ColorRegistry()
+    draw = parse_draw("3 cyan, 4 red", registry=registry)
+    assert draw["cyan"] == 3
+    assert draw.red == 4
+    assert draw.counts == [4, 0, 0, 3]
+    assert draw == FastCubes(red=4, cyan=3, registry=ColorRegistry())
+
+
+def test_default_registry_is_frozen():
+    with pytest.raises(ValueError, match="cyan"):
+        FastCubes(red=4, cyan=3)
+    assert list(FastCubes().registry) == ["red", "green", "blue"]
+
+
+def test_power_ignores_other_registries():
+    cubes = FastCubes(red=1, green=2, blue=3)
+    game = FastGame(1, [cubes])
+    before = power(cubes), solve_p2([game]), solve_p2(GameTable.from_games([game]))
+    parse_draw("3 cyan, 2 red")
+    list(parse("Game 1: 3 cyan, 2 red"))
+    FastCubes(red=4, cyan=3, registry=ColorRegistry())
+    after = power(cubes), solve_p2([game]), solve_p2(GameTable.from_games([game]))
+    assert before == after == (6, 6, 6)
+
+
+def test_from_games_does_not_grow_draw_registries():
+    registry = ColorRegistry()
+    games = [
+        FastGame(1, [FastCubes(red=1, green=1, blue=1, registry=registry)]),
+        FastGame(2, [FastCubes(red=2, cyan=2, registry=ColorRegistry())]),
+    ]
+    table = GameTable.from_games(games)
+    assert list(table.registry) == ["red", "green", "blue", "cyan"]
+    assert list(registry) == ["red", "green", "blue"]
+
+
+def test_fast_game_many_colors(data_many_colors):
+    game_1, game_2 = parse(data_many_colors)
+    assert game_1.minimal_set().nonzero() == {
+        "red": 4,
+        "green": 2,
+        "blue": 6,
+        "cyan": 3,
+        "magenta": 1,
+    }
+    assert game_1.possible({"red": 4, "green": 2, "blue": 6, "cyan": 3, "magenta": 1})
+    assert not game_1.possible(Cubes(red=12, green=13, blue=14))
+    assert game_2.possible(
+        {"red": 1, "green": 2, "blue": 1, "cyan": 2, "magenta": 1, "yellow": 5}
+    )
+
+
+def test_game_table_many_colors(data_many_colors):
+    table = parse_table(data_many_colors)
+    assert list(table.registry) == ["red", "green", "blue", "cyan", "magenta", "yellow"]
+    assert table.minimal_sets().tolist() == [[4, 2, 6, 3, 1, 0], [1, 2, 1, 2, 1, 5]]
+    assert table.column("yellow").tolist() == [0, 0, 0, 5]
+    assert table.column("black").tolist() == [0, 0, 0, 0]
+    assert table.possible(
+        {"red": 4, "green": 2, "blue": 6, "cyan": 3, "magenta": 1}
+    ).tolist() == [True, False]
+    assert table.powers().tolist() == [144, 20]
+    assert solve_p2(table) == solve_p2(parse(data_many_colors)) == 164
+
+
+@pytest.mark.parametrize(
+    "lines",
+    [
+        ["Game 1: 3 red, 5 green, 2 blue, 1 yellow", "Game 2: 2 blue, 1 red, 1 green"],
+        ["Game 2: 2 blue, 1 red, 1 green", "Game 1: 3 red, 5 green, 2 blue, 1 yellow"],
+    ],
+)
+def test_extra_colors(lines):
+    data = "\n".join(lines)
+    assert solve_p1(parse(data)) == solve_p1(parse_table(data)) == 2
+    assert solve_p2(parse(data)) == solve_p2(parse_table(data)) == 30 + 2
+    with pytest.raises(ValueError, match="yellow"):
+        list(parse(data, strict=True))
+
+
+def test_game_table_powers_overflow():
+    registry = ColorRegistry(["red", "green", "blue"] + [f"c{i}" for i in range(37)])
+    table = GameTable([1, 2], [0, 1], [[100] * 40, [0] + [100] * 39], registry)
+    assert table.powers().tolist() == [100**40, 0]
+
+
+def test_tokenize():
+    registry = ColorRegistry()
+    game_ids, offsets, draws, counts, colors = tokenize(
+        "Game 7: 3 blue, 4 red; 2 green\nGame 9: 1 cyan; 5 red, 6 cyan\n", registry
+    )
+    assert game_ids.tolist() == [7, 9]
+    assert offsets.tolist() == [0, 2, 4]
+    assert draws.tolist() == [0, 0, 1, 2, 3, 3]
+    assert counts.tolist() == [3, 4, 2, 1, 5, 6]
+    assert colors.tolist() == [2, 0, 1, 3, 0, 3]
+
+
+def test_parse_table_empty():
+    table = parse_table("")
+    assert table.ids.tolist() == []
+    assert table.counts.shape == (0, 3)
+    assert solve_p1(table) == solve_p1(parse("")) == 0
+    assert solve_p2(table) == solve_p2(parse("")) == 0
+
+
+def test_tokenize_irregular_separators():
+    data = "Game 1: 3 red, 2 blue and 4 green; 1 red\nGame 2: 5 blue 6 green"
+    table = parse_table(data)
+    assert table.counts.tolist() == [[3, 4, 2], [1, 0, 0], [0, 6, 5]]
+    assert table.minimal_sets().tolist() == [[3, 4, 2], [0, 6, 5]]
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        "Game 1: 3 red\nGame 2: \nGame 3: 20 red",
+        "Game 1: 3 red\nGame 2: 20 red\nGame 3: ",
+        "Game 1: \nGame 2: ",
+        "Game 1: 3 red; \nGame 2: 1 blue",
+    ],
+)
+def test_parse_table_games_without_cubes(data):
+    table = parse_table(data)
+    games = list(parse(data))
+    assert table.ids.tolist() == [game.id for game in games]
+    assert table.offsets.tolist() == GameTable.from_games(games).offsets.tolist()
+    assert solve_p1(table) == solve_p1(games)
+    assert solve_p2(table) == solve_p2(games)
+
+
+def test_parse_table_matches_games(data_many_colors):
+    table = parse_table(data_many_colors)
+    games = GameTable.from_games(parse(data_many_colors))
+    assert table.ids.tolist() == games.ids.tolist()
+    assert table.offsets.tolist() == games.offsets.tolist()
+    assert table.counts.tolist() == games.counts.tolist()
@@ -0,0 +1,151 @@
+from concurrent.futures import ProcessPoolExecutor
+from textwrap import dedent
+
+import numpy as np
+import pytest
+
+from solutions.day_03 import (
+    Schematic,
+    byte_grid,
+    gear_ratios,
+    label_numbers,
+    solve_buffer,
+    solve_file,
+    solve_p1,
+    solve_p2,
+)
+
+
+@pytest.fixture
+def data():
+    return dedent(
+        """\
+        467..114..
+        ...*......
+        ..35..633.
+        ......#...
+        617*......
+        .....+.58.
+        ..592.....
+        ......755.
+        ...$.*....
+        .664.598..
+        """
+    )
+
+
+@pytest.fixture
+def schematic(data):
+    return Schematic.from_string(data)
+
+
+@pytest.mark.parametrize(
+    "buffer", [b"12.\n.*3\n", b"12.\n.*3", b"12.\r\n.*3\r\n", b"12.\r\n.*3"]
+)
+def test_byte_grid(buffer):
+    grid = byte_grid(buffer)
+    assert grid.dtype == np.uint8
+    assert grid.shape == (2, 3)
+    assert bytes(grid[1]) == b".*3"
+
+
+def test_byte_grid_is_view():
+    buffer = b"12.\n.*3\n"
+    assert np.shares_memory(byte_grid(buffer), np.frombuffer(buffer, np.uint8))
+
+
+def test_from_bytes(data, schematic):
+    assert np.array_equal(Schematic.from_bytes(data.encode()).grid, schematic.grid)
+
+
+def test_label_numbers(schematic):
+    labels, values = label_numbers(schematic.grid, schematic.num_mask)
+    assert values[1:].tolist() == [467, 114, 35, 633, 617, 58, 592, 755, 664, 598]
+    assert labels[1, 1:4].tolist() == [1, 1, 1]
+    assert labels[1, 4] == 0
+
+
+def test_part_labels(schematic):
+    assert schematic.values[schematic.part_labels].tolist() == [
+        467,
+        35,
+        633,
+        617,
+        592,
+        755,
+        664,
+        598,
+    ]
+
+
+def test_gear_ratios(schematic):
+    assert schematic.gear_ratios().tolist() == [16345, 451490]
+
+
+@pytest.mark.parametrize(
+    "rows, expected",
+    [
+        ([[1, 1, 2], [0, 0, 0], [0, 0, 0]], [2]),
+        ([[1, 0, 2], [3, 0, 0], [0, 0, 0]], []),
+        ([[0, 0, 0], [0, 0, 0], [0, 0, 0]], []),
+        ([[1, 1, 1], [0, 0, 0], [1, 1, 1]], []),
+    ],
+)
+def test_gear_ratios_neighbourhoods(rows, expected):
+    labels = np.pad(np.array(rows), 1)
+    values = np.array([0, 1, 2, 3])
+    assert gear_ratios(labels, values, np.array([[2, 2]])).tolist() == expected
+
+
+def test_cached(schematic):
+    assert schematic.labels is schematic.labels
+    assert schematic.part_labels is schematic.part_labels
+
+
+def test_solve_p1(data):
+    assert solve_p1(data) == 4361
+
+
+def test_solve_p2(data):
+    assert solve_p2(data) == 467835
+
+
+def test_edges():
+    data = "1*2\n...\n3.4\n"
+    schematic = Schematic.from_string(data)
+    assert schematic.solve_p1() == 3
+    assert schematic.solve_p2() == 2
+
+
+@pytest.mark.parametrize("band_rows", [1, 2, 3, 4, 10, 4096])
+def test_solve_buffer(data, band_rows):
+    assert solve_buffer(data.encode(), band_rows) == (4361, 467835)
+
+
+@pytest.mark.parametrize("trailing", ["", "\n"])
+@pytest.mark.parametrize("band_rows", [1, 3, 4096])
+def test_solve_file(data, tmp_path, trailing, band_rows):
+    path = tmp_path / "schematic.txt"
+    path.write_text(data.rstrip("\n") + trailing)
+    assert solve_file(path, band_rows) == (4361, 467835)
+
+
+@pytest.mark.parametrize("trailing", ["", "\n"])
+@pytest.mark.parametrize("band_rows", [1, 3, 4096])
+def test_solve_file_crlf(data, tmp_path, trailing, band_rows):
+    path = tmp_path / "schematic.txt"
+    path.write_text(data.rstrip("\n") + trailing, newline="\r\n")
+    assert solve_file(path, band_rows) == (4361, 467835)
+
+
+def test_solve_file_executor(data, tmp_path):
+    path = tmp_path / "schematic.txt"
+    path.write_text(data)
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        assert solve_file(path, 2, executor) == (4361, 467835)
+
+
+def test_solve_file_empty(tmp_path):
+    path = tmp_path / "schematic.txt"
+    path.write_text("")
+    assert solve_file(path) == (0, 0)
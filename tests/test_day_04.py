@@ -0,0 +1,139 @@
+from io import StringIO
+import random
+from textwrap import dedent
+
+import pytest
+
+from solutions.day_04 import (
+    bitmask,
+    card_matrices,
+    match_counts,
+    n_matches,
+    n_matches_bits,
+    parse,
+    parse_bits,
+    propagate_copies,
+    score_bits_p1,
+    score_counts,
+    score_p1,
+    solve_p1,
+    solve_p2,
+    solve_stream,
+)
+
+
+@pytest.fixture
+def data():
+    return dedent(
+        """\
+        Card 1: 41 48 83 86 17 | 83 86  6 31 17  9 48 53
+        Card 2: 13 32 20 16 61 | 61 30 68 82 17 32 24 19
+        Card 3:  1 21 53 59 44 | 69 82 63 72 16 21 14  1
+        Card 4: 41 92 73 84 69 | 59 84 76 51 58  5 54 83
+        Card 5: 87 83 26 28 32 | 88 30 70 12 93 22 82 36
+        Card 6: 31 18 13 56 72 | 74 77 10 23 35 67 36 11
+        """
+    )
+
+
+def test_bitmask():
+    assert bitmask([0, 3, 5]) == 0b101001
+    assert bitmask([]) == 0
+
+
+def test_parse_bits_matches_sets(data):
+    for (winning, yours), (winning_bits, yours_bits) in zip(
+        parse(data), parse_bits(data)
+    ):
+        assert winning_bits == bitmask(winning)
+        assert n_matches_bits(winning_bits, yours_bits) == n_matches(winning, yours)
+        assert score_bits_p1(winning_bits, yours_bits) == score_p1(winning, yours)
+
+
+def test_card_matrices(data):
+    winning, yours = card_matrices(data)
+    assert winning.shape == yours.shape == (6, 94)
+    assert winning[0].nonzero()[0].tolist() == [17, 41, 48, 83, 86]
+
+
+def test_match_counts(data):
+    counts = match_counts(data)
+    assert counts.tolist() == [4, 2, 2, 1, 0, 0]
+    assert counts.dtype.itemsize == 1
+
+
+@pytest.mark.parametrize(
+    "counts, expected",
+    [([], 0), ([4, 2, 2, 1, 0, 0], 13), ([70, 0, 1], 2**69 + 1)],
+)
+def test_score_counts(counts, expected):
+    assert score_counts(counts) == expected
+
+
+def test_solve_p1(data):
+    assert solve_p1(data) == 13
+
+
+def test_solve_p2(data):
+    assert solve_p2(data) == 30
+
+
+def naive_copies(matches):
+    copies = [1] * len(matches)
+    for i, n_matched in enumerate(matches):
+        for j in range(i + 1, min(i + 1 + n_matched, len(matches))):
+            copies[j] += copies[i]
+    return sum(copies)
+
+
+@pytest.mark.parametrize(
+    "matches",
+    [
+        [],
+        [0],
+        [4, 2, 2, 1, 0, 0],
+        [3, 3, 3, 3, 3],
+        [1, 0, 5, 0, 2, 1, 0, 0, 0],
+    ],
+)
+def test_propagate_copies(matches):
+    assert propagate_copies(matches) == naive_copies(matches)
+
+
+def test_propagate_copies_overflow():
+    matches = [10] * 200
+    total = propagate_copies(matches)
+    assert total > 2**63
+    assert total == naive_copies(matches)
+
+
+def generate_cards(matches, width=12):
+    lines = []
+    for card, n_matched in enumerate(matches, 1):
+        winning = list(range(1, width + 1))
+        yours = winning[:n_matched] + list(range(100, 100 + width - n_matched))
+        lines.append(
+            f"Card {card}: {' '.join(map(str, winning))} | {' '.join(map(str, yours))}"
+        )
+    return "\n".join(lines) + "\n"
+
+
+def test_solve_stream(data):
+    assert solve_stream(StringIO(data)) == (13, 30)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_solve_stream_random(seed):
+    rng = random.Random(seed)
+    matches = [rng.choice([0, 0, 1, 2, 5, 12]) for _ in range(300)]
+    data = generate_cards(matches)
+    assert match_counts(data).tolist() == matches
+    assert solve_stream(StringIO(data)) == (solve_p1(data), solve_p2(data))
+    assert solve_p2(data) == naive_copies(matches)
+
+
+def test_solve_stream_overflow():
+    data = generate_cards([10] * 200)
+    _, total = solve_stream(StringIO(data))
+    assert total > 2**63
+    assert total == solve_p2(data)
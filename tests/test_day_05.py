@@ -1,25 +1,40 @@
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO, StringIO
+import mmap
 from textwrap import dedent
 
+import numpy as np
 import pytest
 
 from solutions.day_05 import (
+    ChangeoverMap,
+    MappingTable,
     changeovers_to_mappings,
+    compose_all_changeovers,
+    compose_changeover_maps,
     compose_changeovers,
     dedup_changeovers,
     follow_from_changeovers,
     follow_one,
     follow_p1,
+    follow_p1_batch,
     delta_mappings,
     find_changeovers,
     find_all_changeovers,
+    find_all_changeover_maps,
     invert_changeovers,
+    merge_ranges,
     parse_line_1_p1,
     parse_line_1_p2,
     parse_lines,
     parse_p1,
     parse_p2,
+    parse_stream,
+    parse_tables,
     solve_p1,
+    solve_p1_stream,
     solve_p2,
+    solve_p2_changeovers,
     Category,
 )
 
@@ -135,6 +150,92 @@ def test_parse_lines(data, parsed_maps):
     assert parse_lines(data.splitlines()[1:]) == parsed_maps
 
 
+def assert_stream_matches(file, seeds_p1, parsed_maps):
+    seeds, blocks = parse_stream(file)
+    assert seeds.tolist() == seeds_p1
+    parsed = {
+        categories: [
+            (range(source, source + length), range(dest, dest + length))
+            for source, dest, length in zip(*map(np.ndarray.tolist, arrays))
+        ]
+        for categories, arrays in blocks
+    }
+    assert parsed == parsed_maps
+
+
+def test_parse_stream_text(data, seeds_p1, parsed_maps):
+    assert_stream_matches(StringIO(data), seeds_p1, parsed_maps)
+
+
+def test_parse_stream_bytes(data, seeds_p1, parsed_maps):
+    assert_stream_matches(BytesIO(data.encode()), seeds_p1, parsed_maps)
+
+
+def test_parse_stream_mmap(data, seeds_p1, parsed_maps, tmp_path):
+    path = tmp_path / "almanac.txt"
+    path.write_text(data)
+    with path.open("rb") as file, mmap.mmap(
+        file.fileno(), 0, access=mmap.ACCESS_READ
+    ) as mapped:
+        assert_stream_matches(mapped, seeds_p1, parsed_maps)
+
+
+def test_parse_tables(data, seeds_p1, parsed_maps):
+    seeds, tables = parse_tables(StringIO(data))
+    assert seeds.tolist() == seeds_p1
+    assert {
+        categories: list(table) for categories, table in tables.items()
+    } == parsed_maps
+
+
+@pytest.mark.parametrize("reverse", [False, True])
+def test_mapping_table_follow(parsed_maps, reverse):
+    for mapping in parsed_maps.values():
+        table = MappingTable.from_ranges(mapping)
+        sources = np.arange(110)
+        assert table.follow(sources, reverse=reverse).tolist() == [
+            follow_one(source, mapping, reverse=reverse) for source in range(110)
+        ]
+        assert follow_one(53, table, reverse=reverse) == follow_one(
+            53, mapping, reverse=reverse
+        )
+
+
+def test_mapping_table_changeovers(parsed_maps):
+    for mapping in parsed_maps.values():
+        table = MappingTable.from_ranges(mapping)
+        changeovers = find_changeovers(mapping)
+        assert find_changeovers(table) == changeovers
+        assert set(MappingTable.from_changeovers(changeovers)) == set(
+            changeovers_to_mappings(changeovers)
+        )
+
+
+def test_mapping_table_arrays_are_read_only():
+    source_starts = np.array([10, 30])
+    table = MappingTable(source_starts, [100, 200], [10, 10])
+    assert table.follow(35) == 205
+    with pytest.raises(ValueError):
+        table.source_starts[:] = [30, 10]
+    with pytest.raises(AttributeError):
+        table.source_starts = np.array([30, 10])
+    source_starts[:] = [30, 10]
+    assert table.follow(35) == 205
+
+
+def test_follow_p1_tables(parsed_maps):
+    tables = {
+        categories: MappingTable.from_ranges(mapping)
+        for categories, mapping in parsed_maps.items()
+    }
+    seeds = np.arange(110)
+    assert (
+        follow_p1_batch(seeds, tables).tolist()
+        == follow_p1_batch(seeds, parsed_maps).tolist()
+    )
+    assert follow_p1(79, tables) == 82
+
+
 @pytest.mark.parametrize(
     ["source", "expected_dest"],
     [
@@ -179,6 +280,134 @@ def test_follow_from_changeovers(source, dest):
     assert follow_from_changeovers(dest, changeovers, reverse=True) == source
 
 
+def test_changeover_map_round_trip():
+    changeovers = {0: 0, 50: 2, 98: -48, 100: 0}
+    changeover_map = ChangeoverMap.from_changeovers(changeovers)
+    assert changeover_map.starts.tolist() == [0, 50, 98, 100]
+    assert changeover_map.to_changeovers() == changeovers
+
+
+@pytest.mark.parametrize(
+    ["source", "dest"],
+    [
+        (-5, -5),
+        (0, 0),
+        (49, 49),
+        (50, 52),
+        (97, 99),
+        (98, 50),
+        (99, 51),
+        (100, 100),
+        (110, 110),
+    ],
+)
+def test_changeover_map_follow(source, dest):
+    changeover_map = ChangeoverMap.from_changeovers({0: 0, 50: 2, 98: -48, 100: 0})
+    assert changeover_map.follow(source) == dest
+
+
+def test_changeover_map_from_mapping(parsed_maps):
+    mapping = parsed_maps[(Category.FERTILIZER, Category.WATER)]
+    assert ChangeoverMap.from_mapping(mapping).to_changeovers() == find_changeovers(
+        mapping
+    )
+
+
+def test_changeover_map_follow_ranges():
+    changeover_map = ChangeoverMap.from_changeovers({0: 0, 50: 2, 98: -48, 100: 0})
+    starts, stops = changeover_map.follow_ranges(
+        np.array([40, 99]), np.array([99, 120])
+    )
+    assert list(zip(starts.tolist(), stops.tolist())) == [
+        (40, 50),
+        (52, 100),
+        (50, 51),
+        (51, 52),
+        (100, 120),
+    ]
+
+
+@pytest.mark.parametrize(
+    ["ranges", "expected"],
+    [
+        ([(0, 5), (5, 10)], [(0, 10)]),
+        ([(10, 20), (0, 5), (3, 12)], [(0, 20)]),
+        ([(30, 40), (0, 5), (7, 7), (6, 8)], [(0, 5), (6, 8), (30, 40)]),
+        ([(7, 7), (3, 3)], []),
+        ([], []),
+    ],
+)
+def test_merge_ranges(ranges, expected):
+    starts, stops = np.array(ranges, dtype=np.int64).reshape(-1, 2).T
+    merged_starts, merged_stops = merge_ranges(starts, stops)
+    assert list(zip(merged_starts.tolist(), merged_stops.tolist())) == expected
+
+
+def test_changeover_map_inverse_is_cached():
+    changeover_map = ChangeoverMap.from_changeovers({0: 0, 50: 2, 98: -48, 100: 0})
+    inverse = changeover_map.inverse()
+    assert inverse.to_changeovers() == {0: 0, 50: 48, 52: -2, 100: 0}
+    assert changeover_map.inverse() is inverse
+    assert inverse.inverse() is changeover_map
+
+
+def test_changeover_map_setitem_invalidates_inverse():
+    changeover_map = ChangeoverMap.from_changeovers({0: 0, 50: 2, 98: -48, 100: 0})
+    inverse = changeover_map.inverse()
+    changeover_map[100] = 5
+    changeover_map[105] = -5
+    changeover_map[110] = 0
+    assert changeover_map.to_changeovers() == {
+        0: 0,
+        50: 2,
+        98: -48,
+        100: 5,
+        105: -5,
+        110: 0,
+    }
+    assert changeover_map.inverse() is not inverse
+    assert changeover_map.follow(102, reverse=True) == 107
+    del changeover_map[105]
+    del changeover_map[110]
+    assert changeover_map.follow(130, reverse=True) == 125
+
+
+def test_changeover_map_arrays_are_read_only():
+    starts = np.array([0, 50, 98, 100])
+    changeover_map = ChangeoverMap(starts, [0, 2, -48, 0])
+    inverse = changeover_map.inverse()
+    with pytest.raises(ValueError):
+        changeover_map.deltas[1] = 5
+    with pytest.raises(ValueError):
+        changeover_map.starts[1] = 60
+    starts[1] = 60
+    changeover_map[98] = -40
+    with pytest.raises(ValueError):
+        changeover_map.deltas[1] = 5
+    assert changeover_map.starts.tolist() == [0, 50, 98, 100]
+    assert changeover_map.inverse() is not inverse
+
+
+@pytest.mark.parametrize("location", [35, 43, 46, 82, 86])
+def test_compose_all_changeovers_reverse(parsed_maps, location):
+    changeover_map = compose_all_changeovers(parsed_maps)
+    seed = changeover_map.follow(location, reverse=True)
+    assert follow_p1(int(seed), parsed_maps) == location
+
+
+def test_changeover_map_compose():
+    first = ChangeoverMap.from_changeovers({0: 0, 50: 2, 98: -48, 100: 0})
+    second = ChangeoverMap.from_changeovers({0: 39, 15: -15, 52: -15, 54: 0})
+    assert first.compose(second).to_changeovers() == {
+        0: 39,
+        15: -15,
+        50: -13,
+        52: 2,
+        98: -63,
+        100: 0,
+    }
+
+
 @pytest.mark.parametrize(
     ["original", "expected"],
     [
@@ -232,6 +461,36 @@ def test_follow_p1(seed, expected_location, parsed_maps):
     assert follow_p1(seed, parsed_maps) == expected_location
 
 
+def test_follow_p1_batch(seeds_p1, parsed_maps):
+    seeds = np.array([*seeds_p1, *range(110)])
+    expected = [follow_p1(seed, parsed_maps) for seed in seeds.tolist()]
+    assert follow_p1_batch(seeds, parsed_maps).tolist() == expected
+
+
+@pytest.mark.parametrize(
+    "mapping",
+    [
+        [(range(0, 10), range(100, 110)), (range(5, 15), range(200, 210))],
+        [(range(5, 15), range(200, 210)), (range(0, 10), range(100, 110))],
+        [(range(0, 20), range(100, 120)), (range(5, 8), range(50, 53))],
+        [(range(5, 8), range(50, 53)), (range(0, 20), range(100, 120))],
+        [(range(3, 3), range(40, 40)), (range(0, 4), range(0, 4))],
+        [(range(3, 3), range(40, 40)), (range(2, 6), range(30, 34))],
+    ],
+)
+def test_follow_p1_batch_overlapping(mapping):
+    mappings = {(Category.SEED, Category.SOIL): mapping}
+    sources = np.arange(25)
+    expected = [follow_p1(source, mappings) for source in sources.tolist()]
+    assert follow_p1_batch(sources, mappings).tolist() == expected
+    table = MappingTable.from_ranges(mapping)
+    assert find_changeovers(table) == find_changeovers(mapping)
+    for reverse in (False, True):
+        assert table.follow(sources, reverse=reverse).tolist() == [
+            follow_one(source, mapping, reverse=reverse) for source in range(25)
+        ]
+
+
 @pytest.mark.parametrize(
     ["source", "expected_delta"],
     [
@@ -283,6 +542,13 @@ def test_find_all_changeovers(parsed_maps):
     assert list(find_all_changeovers(parsed_maps)) == expected
 
 
+def test_find_all_changeover_maps(parsed_maps):
+    assert [
+        changeover_map.to_changeovers()
+        for changeover_map in find_all_changeover_maps(parsed_maps)
+    ] == list(find_all_changeovers(parsed_maps))
+
+
 @pytest.mark.parametrize(
     ["changeovers", "expected"],
     [
@@ -336,9 +602,40 @@ def test_compose_changeovers(changeovers, expected):
     assert compose_changeovers(*changeovers) == expected
 
 
+def test_compose_changeovers_many_layers():
+    layers = [{0: 0, 50: 2, 98: -48, 100: 0}, {0: 0, 50: 48, 52: -2, 100: 0}] * 1500
+    assert compose_changeovers(*layers) == {0: 0}
+
+
+def test_compose_changeover_maps_executor(parsed_maps):
+    changeover_maps = list(find_all_changeover_maps(parsed_maps))
+    expected = compose_changeover_maps(changeover_maps).to_changeovers()
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        composed = compose_changeover_maps(changeover_maps, executor)
+    assert composed.to_changeovers() == expected
+
+
 def test_solve_p1(data):
     assert solve_p1(data) == 35
 
 
+def test_solve_p1_stream(data):
+    assert solve_p1_stream(StringIO(data)) == 35
+
+
 def test_solve_p2(data):
     assert solve_p2(data) == 46
+
+
+def test_solve_p2_changeovers(data):
+    assert solve_p2_changeovers(data) == 46
+
+
+@pytest.mark.parametrize(
+    ["seeds", "expected"],
+    [("79 0 55 13", 56), ("79 0 55 0", float("inf")), ("", float("inf"))],
+)
+def test_solve_p2_empty_seed_ranges(data, seeds, expected):
+    data = data.replace("79 14 55 13", seeds, 1)
+    assert solve_p2(data) == expected
+    assert solve_p2_changeovers(data) == expected
@@ -0,0 +1,141 @@
+from textwrap import dedent
+
+import numpy as np
+import pytest
+
+from solutions.day_06 import (
+    floor_sqrt,
+    parse_p1,
+    parse_p2,
+    product,
+    solve_batch,
+    solve_p1,
+    solve_p2,
+    ways_to_win,
+    ways_to_win_batch,
+)
+
+
+@pytest.fixture
+def data():
+    return dedent(
+        """\
+        Time:      7  15   30
+        Distance:  9  40  200"""
+    )
+
+
+def brute_force(total_time, record):
+    return sum(hold * (total_time - hold) > record for hold in range(total_time + 1))
+
+
+def bisect_ways(total_time, record):
+    low, high = 0, total_time // 2 + 1
+    while low < high:
+        hold = (low + high) // 2
+        if hold * (total_time - hold) > record:
+            high = hold
+        else:
+            low = hold + 1
+    return max(total_time - 2 * low + 1, 0)
+
+
+def test_parse_p1(data):
+    assert list(parse_p1(data)) == [(7, 9), (15, 40), (30, 200)]
+
+
+def test_parse_p2(data):
+    assert parse_p2(data) == (71530, 940200)
+
+
+@pytest.mark.parametrize(
+    "total_time, record, expected",
+    [(7, 9, 4), (15, 40, 8), (30, 200, 9), (4, 4, 0), (4, 3, 1), (3, 5, 0)],
+)
+def test_ways_to_win(total_time, record, expected):
+    assert ways_to_win(total_time, record) == expected
+
+
+def test_ways_to_win_brute_force():
+    for total_time in range(40):
+        for record in range(-2, total_time**2 // 4 + 2):
+            assert ways_to_win(total_time, record) == brute_force(total_time, record)
+
+
+@pytest.mark.parametrize("exponent", [26, 27, 40, 64, 200])
+def test_ways_to_win_large(exponent):
+    total_time = 2**exponent + 12345
+    for hold in (1, 3, total_time // 3, total_time // 2):
+        record = hold * (total_time - hold)
+        for offset in (-1, 0, 1):
+            expected = bisect_ways(total_time, record + offset)
+            assert ways_to_win(total_time, record + offset) == expected
+
+
+@pytest.mark.parametrize("n", [0, 1, 2**52 - 1, 2**52, 2**104 - 1, 10**40])
+def test_floor_sqrt(n):
+    root = floor_sqrt(n)
+    assert root * root <= n < (root + 1) ** 2
+
+
+def test_solve_p1(data):
+    assert solve_p1(data) == 288
+
+
+def test_solve_p2(data):
+    assert solve_p2(data) == 71503
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_ways_to_win_batch(seed):
+    rng = np.random.default_rng(seed)
+    times = rng.integers(0, 2**31, size=2000)
+    holds = rng.integers(0, times // 2 + 1)
+    records = holds * (times - holds) + rng.integers(-1, 2, size=len(times))
+    expected = [ways_to_win(t, r) for t, r in zip(times.tolist(), records.tolist())]
+    ways = ways_to_win_batch(times, records)
+    assert ways.dtype == np.int64
+    assert ways.tolist() == expected
+
+
+def test_ways_to_win_batch_small():
+    times, records = np.meshgrid(np.arange(40), np.arange(-2, 402))
+    expected = [
+        [brute_force(t, r) for t, r in zip(row_times, row_records)]
+        for row_times, row_records in zip(times.tolist(), records.tolist())
+    ]
+    assert ways_to_win_batch(times, records).tolist() == expected
+
+
+def test_ways_to_win_batch_broadcast():
+    assert ways_to_win_batch(30, np.array([199, 200, 201])).tolist() == [11, 9, 9]
+
+
+def test_ways_to_win_batch_fallback():
+    times = np.array([2**40, 71530, 2**70], dtype=object)
+    records = np.array([2**70, 940200, 2**130], dtype=object)
+    expected = [ways_to_win(t, r) for t, r in zip(times, records)]
+    assert ways_to_win_batch(times, records).tolist() == expected
+
+
+@pytest.mark.parametrize(
+    "ways",
+    [
+        np.array([4, 8, 9]),
+        np.array([2**40, 2**40, 3]),
+        np.array([2**40, 0, 2**40]),
+        np.array([2**70, 3], dtype=object),
+        np.array([], dtype=np.int64),
+    ],
+)
+def test_product(ways):
+    expected = 1
+    for way in ways.tolist():
+        expected *= way
+    assert product(ways) == expected
+
+
+def test_solve_batch():
+    ways, answer = solve_batch(np.array([7, 15, 30]), np.array([9, 40, 200]))
+    assert ways.tolist() == [4, 8, 9]
+    assert answer == 288
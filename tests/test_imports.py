@@ -0,0 +1,22 @@
+import subprocess
+import sys
+
+import pytest
+
+from benchmarks.bench_imports import LAZY_MODULES, MODULES, ROOT
+
+
+@pytest.mark.parametrize("module", MODULES)
+def test_import_is_side_effect_free(module):
+    code = (
+        f"import sys, {module}; "
+        f"print(' '.join(m for m in {LAZY_MODULES!r} if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.strip() == ""